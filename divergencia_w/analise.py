@@ -13,6 +13,7 @@ import warnings
 from .matematica import (
     calcular_kl, calcular_w, calcular_jensen_shannon, calcular_hellinger
 )
+from .core.matematica_base import calcular_w_lambdas, calcular_divergencias
 from .gerador_dados import gerar_gaussiana, gerar_esparsa, gerar_cenarios_teste
 
 
@@ -129,11 +130,15 @@ def comparar_cenarios() -> Dict[str, Dict]:
         
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
+            if np.all(np.isfinite(p)):
+                divergencias = calcular_divergencias(p, q)
+            else:
+                divergencias = dict.fromkeys(('w', 'kl', 'js', 'hellinger'), np.nan)
             resultados[nome] = {
-                'Divergência W': calcular_w(p, q) if np.all(np.isfinite(p)) else np.nan,
-                'KL': calcular_kl(p, q) if np.all(np.isfinite(p)) else np.nan,
-                'Jensen-Shannon': calcular_jensen_shannon(p, q) if np.all(np.isfinite(p)) else np.nan,
-                'Hellinger': calcular_hellinger(p, q) if np.all(np.isfinite(p)) else np.nan
+                'Divergência W': divergencias['w'],
+                'KL': divergencias['kl'],
+                'Jensen-Shannon': divergencias['js'],
+                'Hellinger': divergencias['hellinger']
             }
     
     return resultados
@@ -151,6 +156,6 @@ def analise_sensibilidade_lambda(lambdas: np.ndarray = None, seed: Optional[int]
     
     return {
         'lambdas': lambdas,
-        'pequena_diferenca': [calcular_w(p1, q1, lambda_suavizacao=l) for l in lambdas],
-        'grande_diferenca': [calcular_w(p2, q2, lambda_suavizacao=l) for l in lambdas]
+        'pequena_diferenca': calcular_w_lambdas(p1, q1, lambdas).tolist(),
+        'grande_diferenca': calcular_w_lambdas(p2, q2, lambdas).tolist()
     }
@@ -4,14 +4,26 @@ Divergência W - Pacote de Aplicações Práticas
 Autor: Luiz Tiago Wilcke
 """
 
-from .detector_anomalias import DetectorAnomalias
-from .monitor_data_drift import MonitorDataDrift
+from .detector_anomalias import DetectorAnomalias, DetectorAnomaliasOnline, DetectorAnomaliasMultiSerie
+from .monitor_data_drift import (
+    MonitorDataDrift, MonitorDataDriftMultivariado, MonitorDataDriftCategorico, AcumuladorDrift,
+    salvar_baseline, carregar_baseline
+)
 from .analise_financeira import AnaliseFinanceira
+from .detector_pontos_mudanca import DetectorPontosMudanca
 from .gerador_cenarios import GeradorCenarios
 
 __all__ = [
     'DetectorAnomalias',
+    'DetectorAnomaliasOnline',
+    'DetectorAnomaliasMultiSerie',
     'MonitorDataDrift',
+    'MonitorDataDriftMultivariado',
+    'MonitorDataDriftCategorico',
+    'AcumuladorDrift',
+    'salvar_baseline',
+    'carregar_baseline',
     'AnaliseFinanceira',
+    'DetectorPontosMudanca',
     'GeradorCenarios'
 ]
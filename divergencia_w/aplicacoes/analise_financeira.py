@@ -4,8 +4,29 @@ Divergência W - Análise Financeira e de Mercado
 Autor: Luiz Tiago Wilcke
 """
 
+import os
 import numpy as np
-from ..core.matematica_base import calcular_w
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from ..core.matematica_base import calcular_w, calcular_w_lote
+from ..core.histograma_deslizante import HistogramaDeslizante
+from ..core.histograma_acumulado import (
+    indices_bins_uniformes, contagens_acumuladas, w_janelas_adjacentes, w_multiescala
+)
+from ..core.kde_fft import kde_fft, binning_linear, suavizar_fft
+
+
+def _analisar_colunas_compartilhadas(analise, nome_precos, nome_scores, forma, inicio, fim, metodo):
+    """Tarefa do pool: lê preços e escreve scores direto na memória compartilhada."""
+    memoria_precos = shared_memory.SharedMemory(name=nome_precos)
+    memoria_scores = shared_memory.SharedMemory(name=nome_scores)
+    try:
+        precos = np.ndarray(forma, dtype=np.float64, buffer=memoria_precos.buf)
+        scores = np.ndarray(forma, dtype=np.float32, buffer=memoria_scores.buf)
+        analise._analisar_colunas(precos, scores, inicio, fim, metodo)
+    finally:
+        memoria_precos.close()
+        memoria_scores.close()
 
 class AnaliseFinanceira:
     """
@@ -13,8 +34,25 @@ class AnaliseFinanceira:
     Foca na detecção de mudanças de regime (regime switching) e eventos de cauda.
     """
     
-    def __init__(self, window_size=252):
+    # Janela Curta (ex: 21 dias - 1 mês) vs Janela Longa (ex: 252 dias - 1 ano)
+    JANELA_CURTA = 21
+    JANELA_LONGA = 252
+    BINS = 50
+    # Range fixo para comparações financeiras padronizadas
+    FAIXA_PADRAO = (-0.15, 0.15)
+    
+    ESTIMADORES = ('histograma', 'kde')
+    
+    def __init__(self, window_size=252, estimador='histograma'):
+        """
+        Args:
+            estimador (str): 'histograma' ou 'kde' (KDE gaussiano binado via
+                FFT; suaviza as distribuições da janela curta)
+        """
+        if estimador not in self.ESTIMADORES:
+            raise ValueError(f"Estimador desconhecido: {estimador}. Use um de {self.ESTIMADORES}")
         self.window_size = window_size
+        self.estimador = estimador
         
     def calcular_retornos(self, precos):
         """Calcula retornos logarítmicos."""
@@ -23,14 +61,32 @@ class AnaliseFinanceira:
         # Remove NaNs e inits
         return retornos[~np.isnan(retornos)]
         
-    def detectar_mudanca_regime(self, retornos):
+    def detectar_mudanca_regime(self, retornos, metodo='janela', tamanho_bloco=65536):
         """
         Detecta mudanças de regime de volatilidade comparando
         a distribuição do último mês com o último ano.
+        
+        Args:
+            retornos (array-like): Série de retornos
+            metodo (str): 'janela' (histogramas refeitos a cada ponto, faixa
+                ajustada por janela), 'deslizante' (bordas fixas na faixa
+                padrão estendida à faixa da série e histogramas incrementais,
+                O(1) por ponto; apenas com estimador 'histograma') ou 'acumulado'
+                (mesmas bordas fixas; histogramas, ou pesos do KDE binado, como
+                diferenças de somas acumuladas e todos os scores em lote)
+            tamanho_bloco (int): Dias pontuados por bloco no modo 'acumulado'
         """
-        # Janela Curta (ex: 21 dias - 1 mês) vs Janela Longa (ex: 252 dias - 1 ano)
-        janela_curta = 21
-        janela_longa = 252
+        janela_curta = self.JANELA_CURTA
+        janela_longa = self.JANELA_LONGA
+        
+        if metodo == 'deslizante':
+            if self.estimador != 'histograma':
+                raise ValueError("O método 'deslizante' requer estimador='histograma'")
+            return self._detectar_regime_deslizante(np.asarray(retornos, dtype=np.float64))
+        if metodo == 'acumulado':
+            return self._detectar_regime_acumulado(np.asarray(retornos, dtype=np.float64), tamanho_bloco)
+        if metodo != 'janela':
+            raise ValueError(f"Método desconhecido: {metodo}")
         
         scores_regime = []
         indices = []
@@ -59,17 +115,201 @@ class AnaliseFinanceira:
             
         return indices, scores_regime
 
+    def _faixa(self, dados):
+        """Faixa padrão estendida para cobrir os dados."""
+        range_min, range_max = self.FAIXA_PADRAO
+        if len(dados) > 0:
+            range_min = min(range_min, np.min(dados))
+            range_max = max(range_max, np.max(dados))
+        return range_min, range_max
+
+    def _detectar_regime_deslizante(self, retornos):
+        """Mesmas janelas de `detectar_mudanca_regime`, com `HistogramaDeslizante`."""
+        janela_curta, janela_longa = self.JANELA_CURTA, self.JANELA_LONGA
+        n = len(retornos)
+        if n <= janela_longa:
+            return [], []
+        bordas = np.linspace(*self._faixa(retornos), self.BINS + 1)
+        histograma = HistogramaDeslizante(bordas, janela_longa - janela_curta, janela_curta)
+        # Score em i usa os retornos até i-1
+        scores = histograma.empurrar_lote(retornos[:n - 1])[janela_longa - 1:]
+        return list(range(janela_longa, n)), scores.tolist()
+
+    def _detectar_regime_acumulado(self, retornos, tamanho_bloco):
+        """
+        Mesmas janelas e bordas do modo 'deslizante'; o histograma de cada janela
+        é a diferença de duas linhas da tabela de contagens acumuladas, e W é
+        calculada em lote para todos os dias de um bloco.
+        """
+        janela_curta, janela_longa = self.JANELA_CURTA, self.JANELA_LONGA
+        n = len(retornos)
+        if n <= janela_longa:
+            return [], []
+        faixa = self._faixa(retornos)
+        if self.estimador == 'kde':
+            return self._detectar_regime_kde_acumulado(retornos, faixa, tamanho_bloco)
+        bins = indices_bins_uniformes(retornos, *faixa, self.BINS)
+        scores = np.empty(n - janela_longa)
+        for i0 in range(janela_longa, n, tamanho_bloco):
+            i1 = min(n, i0 + tamanho_bloco)
+            acumulado = contagens_acumuladas(bins[i0 - janela_longa:i1], self.BINS)
+            # Janelas terminando em i0..i1; a última pertence ao dia i1
+            scores[i0 - janela_longa:i1 - janela_longa] = w_janelas_adjacentes(
+                acumulado, janela_longa - janela_curta, janela_curta)[:-1]
+        return list(range(janela_longa, n)), scores.tolist()
+
+    def detectar_mudanca_regime_multiescala(self, retornos, janelas):
+        """
+        Scores de regime para vários pares (janela curta, janela longa) em uma
+        única varredura: os retornos são binados uma vez (bordas do modo
+        'acumulado') e todas as escalas usam a mesma tabela de contagens
+        acumuladas.
+        
+        Args:
+            retornos (array-like): Série de retornos
+            janelas (list): Pares (janela_curta, janela_longa), p.ex.
+                [(5, 63), (21, 252)]
+            
+        Returns:
+            np.ndarray: Matriz (n_escalas, n); a coluna i da linha k equivale
+            ao score do dia i em `detectar_mudanca_regime(..., 'acumulado')`
+            com essas janelas (NaN antes de janela_longa)
+        """
+        if self.estimador != 'histograma':
+            raise ValueError("A varredura multiescala requer estimador='histograma'")
+        retornos = np.asarray(retornos, dtype=np.float64).ravel()
+        janelas = np.asarray(janelas, dtype=np.intp).reshape(-1, 2)
+        curtas, longas = janelas[:, 0], janelas[:, 1]
+        if np.any(curtas <= 0) or np.any(longas <= curtas):
+            raise ValueError("Cada par deve satisfazer 0 < janela_curta < janela_longa")
+        n = len(retornos)
+        if n == 0:
+            return np.full((len(janelas), 0), np.nan)
+        bins = indices_bins_uniformes(retornos, *self._faixa(retornos), self.BINS)
+        acumulado = contagens_acumuladas(bins, self.BINS)
+        # Janelas terminando em j pontuam o dia j (retornos até j-1)
+        return w_multiescala(acumulado, longas - curtas, curtas)[:, :n]
+
+    def _detectar_regime_kde_acumulado(self, retornos, faixa, tamanho_bloco):
+        """
+        Variante KDE do modo 'acumulado': o binning linear é aditivo, então os
+        pesos de cada janela também são diferenças de somas acumuladas. A
+        largura de banda de cada janela segue Silverman com σ obtido das somas
+        acumuladas de x e x² (sem o termo do IQR, que não é aditivo).
+        """
+        janela_curta, janela_longa = self.JANELA_CURTA, self.JANELA_LONGA
+        janela_base = janela_longa - janela_curta
+        n = len(retornos)
+        espacamento = (faixa[1] - faixa[0]) / (self.BINS - 1)
+        scores = np.empty(n - janela_longa)
+        for i0 in range(janela_longa, n, tamanho_bloco):
+            i1 = min(n, i0 + tamanho_bloco)
+            bloco = retornos[i0 - janela_longa:i1]
+            pesos = np.zeros((len(bloco) + 1, self.BINS))
+            pesos[1:] = binning_linear(bloco[:, None], *faixa, self.BINS)
+            momentos = np.zeros((len(bloco) + 1, 2))
+            momentos[1:] = np.column_stack([bloco, bloco ** 2])
+            np.cumsum(pesos, axis=0, out=pesos)
+            np.cumsum(momentos, axis=0, out=momentos)
+            
+            # Fins de janela i0..i1-1 (posições janela_longa.. no bloco)
+            fim = np.arange(janela_longa, len(bloco))
+            distribuicoes = []
+            for inicio, corte, tamanho in ((fim - janela_longa, fim - janela_curta, janela_base),
+                                           (fim - janela_curta, fim, janela_curta)):
+                soma, soma_quadrados = (momentos[corte] - momentos[inicio]).T
+                sigma = np.sqrt(np.maximum(soma_quadrados - soma ** 2 / tamanho, 0) / max(tamanho - 1, 1))
+                largura = 0.9 * sigma * tamanho ** (-0.2) / espacamento
+                distribuicoes.append(suavizar_fft(pesos[corte] - pesos[inicio], largura))
+            scores[i0 - janela_longa:i1 - janela_longa] = calcular_w_lote(*distribuicoes)
+        return list(range(janela_longa, n)), scores.tolist()
+
+    def _analisar_colunas(self, precos, scores, inicio, fim, metodo):
+        """Preenche `scores[:, inicio:fim]` a partir das colunas de preços correspondentes."""
+        for ativo in range(inicio, fim):
+            retornos = np.diff(np.log(precos[:, ativo]))
+            validos = ~np.isnan(retornos)
+            # Data (linha de preços) em que termina cada retorno válido
+            datas = np.nonzero(validos)[0] + 1
+            indices, scores_ativo = self.detectar_mudanca_regime(retornos[validos], metodo=metodo)
+            if indices:
+                # Score do índice i usa os retornos até i-1, conhecidos na data datas[i-1]
+                scores[datas[np.asarray(indices) - 1], ativo] = scores_ativo
+
+    def _matriz_painel(self, precos):
+        """Converte o painel em matriz float64 (datas x ativos), alinhando dicts pelo fim."""
+        if isinstance(precos, dict):
+            series = [np.asarray(serie, dtype=np.float64).ravel() for serie in precos.values()]
+            n_datas = max((len(serie) for serie in series), default=0)
+            matriz = np.full((n_datas, len(series)), np.nan)
+            for ativo, serie in enumerate(series):
+                matriz[n_datas - len(serie):, ativo] = serie
+            return matriz
+        matriz = np.asarray(precos, dtype=np.float64)
+        if matriz.ndim != 2:
+            raise ValueError(f"Painel deve ser 2-D (datas x ativos), recebido shape {matriz.shape}")
+        return matriz
+
+    def analisar_painel(self, precos, n_processos=None, metodo='acumulado'):
+        """
+        Detecta mudanças de regime em um universo de ativos em paralelo.
+        
+        A matriz de preços é copiada uma única vez para memória compartilhada;
+        cada processo lê suas colunas e escreve os scores direto na matriz de
+        saída compartilhada, sem serializar os dados.
+        
+        Args:
+            precos: Matriz (datas x ativos) ou dict {ativo: série de preços};
+                séries de tamanhos diferentes são alinhadas pela data final e
+                preenchidas com NaN no início (colunas na ordem do dict)
+            n_processos (int, optional): Processos do pool (padrão: núcleos
+                disponíveis); 1 executa no processo atual
+            metodo (str): Método de `detectar_mudanca_regime` por ativo
+            
+        Returns:
+            np.ndarray: Scores float32 (datas x ativos); NaN onde não há score
+        """
+        matriz = self._matriz_painel(precos)
+        forma = matriz.shape
+        n_ativos = forma[1]
+        n_processos = min(n_processos or os.cpu_count() or 1, max(n_ativos, 1))
+        if n_processos <= 1 or n_ativos == 0:
+            scores = np.full(forma, np.nan, dtype=np.float32)
+            self._analisar_colunas(matriz, scores, 0, n_ativos, metodo)
+            return scores
+        
+        memoria_precos = shared_memory.SharedMemory(create=True, size=max(matriz.nbytes, 1))
+        memoria_scores = shared_memory.SharedMemory(create=True, size=max(matriz.size * 4, 1))
+        try:
+            np.ndarray(forma, dtype=np.float64, buffer=memoria_precos.buf)[:] = matriz
+            scores = np.ndarray(forma, dtype=np.float32, buffer=memoria_scores.buf)
+            scores[:] = np.nan
+            # Vários grupos por processo equilibram ativos com históricos desiguais
+            limites = np.linspace(0, n_ativos, min(n_ativos, 4 * n_processos) + 1).astype(int)
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                tarefas = [executor.submit(_analisar_colunas_compartilhadas, self, memoria_precos.name,
+                                           memoria_scores.name, forma, inicio, fim, metodo)
+                           for inicio, fim in zip(limites[:-1], limites[1:])]
+                for tarefa in tarefas:
+                    tarefa.result()
+            resultado = scores.copy()
+            del scores
+            return resultado
+        finally:
+            memoria_precos.close()
+            memoria_precos.unlink()
+            memoria_scores.close()
+            memoria_scores.unlink()
+
     def _kde_simples(self, dados, bins=50):
         """Estimativa de densidade simples via histograma suavizado."""
         # Range fixo para comparações financeiras padronizadas (ex: -10% a +10%)
         # Mas adaptativo é melhor se normalizarmos os dados.
-        # Vamos usar range fixo de -0.15 a 0.15 que cobre a maioria dos movimentos diários
-        range_min, range_max = -0.15, 0.15
-        
-        if len(dados) > 0:
-             # Ajuste fino se dados excederem
-            range_min = min(range_min, np.min(dados))
-            range_max = max(range_max, np.max(dados))
+        # Vamos usar range fixo de -0.15 a 0.15 que cobre a maioria dos movimentos diários,
+        # com ajuste fino se os dados excederem
+        range_min, range_max = self._faixa(dados)
+        if self.estimador == 'kde':
+            return kde_fft(dados, range_min, range_max, bins)
             
         hist, _ = np.histogram(dados, bins=bins, range=(range_min, range_max), density=True)
         return np.maximum(hist, 1e-10) / np.sum(np.maximum(hist, 1e-10))
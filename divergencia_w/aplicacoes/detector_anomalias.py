@@ -5,7 +5,18 @@ Autor: Luiz Tiago Wilcke
 """
 
 import numpy as np
-from ..core.matematica_base import calcular_w, calcular_kl
+from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
+from ..core.matematica_base import (
+    calcular_w, calcular_kl, calcular_w_lote, calcular_divergencias_lote
+)
+from ..core.histograma_deslizante import HistogramaDeslizante
+from ..core.histograma_acumulado import (
+    indices_bins_uniformes, contagens_acumuladas, w_janelas_adjacentes, w_multiescala
+)
+from ..core.kde_fft import kde_fft, kde_fft_lote
+
+ESTIMADORES = ('histograma', 'kde')
 
 class DetectorAnomalias:
     """
@@ -13,32 +24,168 @@ class DetectorAnomalias:
     Compara a distribuição em uma janela de referência com uma janela atual.
     """
     
-    def __init__(self, tamanho_janela=50, threshold=0.1, usar_w=True):
+    BINS = 10
+    
+    def __init__(self, tamanho_janela=50, threshold=0.1, usar_w=True, estimador='histograma'):
+        """
+        Args:
+            estimador (str): 'histograma' ou 'kde' (KDE gaussiano binado via
+                FFT em BINS pontos da faixa de cada janela; mais estável em
+                janelas curtas)
+        """
+        if estimador not in ESTIMADORES:
+            raise ValueError(f"Estimador desconhecido: {estimador}. Use um de {ESTIMADORES}")
         self.tamanho_janela = tamanho_janela
         self.threshold = threshold
         self.usar_w = usar_w
+        self.estimador = estimador
         self.historico_divergencias = []
         
     def _calcular_distribuicao(self, dados):
         """Converte dados numéricos em uma distribuição de probabilidade suave."""
+        if self.estimador == 'kde':
+            minimo, maximo = np.min(dados), np.max(dados)
+            if minimo == maximo:
+                minimo, maximo = minimo - 0.5, maximo + 0.5
+            return kde_fft(dados, minimo, maximo, self.BINS)
         # Histograma simples
-        hist, _ = np.histogram(dados, bins=10, density=True)
+        hist, _ = np.histogram(dados, bins=self.BINS, density=True)
         # Suavização para evitar zeros
         hist = np.maximum(hist, 1e-10)
         return hist / np.sum(hist)
+    
+    def _distribuicoes_janelas(self, dados, inicio, fim):
+        """
+        Equivalente vetorizado de `_calcular_distribuicao` para todas as janelas
+        de tamanho `tamanho_janela` que começam em [inicio, fim). Reproduz o
+        algoritmo de bins uniformes de `np.histogram` (faixa min/max de cada
+        janela, correção de ULP nas bordas e `density=True`).
+        """
+        bins = self.BINS
+        janelas = sliding_window_view(dados, self.tamanho_janela)[inicio:fim]
+        primeira = janelas.min(axis=1)
+        ultima = janelas.max(axis=1)
+        iguais = primeira == ultima
+        primeira = np.where(iguais, primeira - 0.5, primeira)
+        ultima = np.where(iguais, ultima + 0.5, ultima)
+        if self.estimador == 'kde':
+            return kde_fft_lote(janelas, primeira, ultima, bins)
+        bordas = np.linspace(primeira, ultima, bins + 1, axis=1)
+        
+        indices = (((janelas - primeira[:, None]) / (ultima - primeira)[:, None]) * bins).astype(np.intp)
+        indices[indices == bins] -= 1
+        indices -= janelas < np.take_along_axis(bordas, indices, axis=1)
+        indices += (janelas >= np.take_along_axis(bordas, indices + 1, axis=1)) & (indices != bins - 1)
+        
+        n_janelas = len(janelas)
+        deslocamento = np.arange(n_janelas)[:, None] * bins
+        contagens = np.bincount((indices + deslocamento).ravel(),
+                                minlength=n_janelas * bins).reshape(n_janelas, bins)
+        hist = contagens / np.diff(bordas, axis=1) / self.tamanho_janela
+        hist = np.maximum(hist, 1e-10)
+        return hist / np.sum(hist, axis=1, keepdims=True)
+    
+    def _detectar_vetorizado(self, dados, tamanho_bloco):
+        """Pontua todas as janelas em blocos com histogramas e divergências em lote."""
+        w_size = self.tamanho_janela
+        n = len(dados)
+        divergencias = np.zeros(max(n, w_size))
+        for i0 in range(2 * w_size, n, tamanho_bloco):
+            i1 = min(n, i0 + tamanho_bloco)
+            # Janelas que começam em [i0-2w, i1-w): referências nas primeiras
+            # i1-i0 posições e testes deslocados de w
+            dist = self._distribuicoes_janelas(dados, i0 - 2 * w_size, i1 - w_size)
+            p, q = dist[:i1 - i0], dist[w_size:]
+            if self.usar_w:
+                divergencias[i0:i1] = calcular_w_lote(p, q)
+            else:
+                divergencias[i0:i1] = calcular_divergencias_lote(p, q, metricas=('kl',))['kl']
+        anomalias = np.nonzero(divergencias[2 * w_size:] > self.threshold)[0] + 2 * w_size
+        return anomalias.tolist(), divergencias.tolist()
+    
+    def _detectar_deslizante(self, dados):
+        """
+        Mesmas janelas do modo 'janela', mas com bordas fixas (faixa global da
+        série) e histogramas mantidos incrementalmente: O(1) por ponto.
+        """
+        if not self.usar_w or self.estimador != 'histograma':
+            raise ValueError("O método 'deslizante' requer usar_w=True e estimador='histograma'")
+        w_size = self.tamanho_janela
+        n = len(dados)
+        divergencias = np.zeros(max(n, w_size))
+        if n > 2 * w_size:
+            minimo, maximo = self._faixa_serie(dados)
+            histograma = HistogramaDeslizante(np.linspace(minimo, maximo, self.BINS + 1), w_size)
+            # Score em i usa as amostras até i-1
+            divergencias[2 * w_size:] = histograma.empurrar_lote(dados[:n - 1])[2 * w_size - 1:]
+        anomalias = np.nonzero(divergencias[2 * w_size:] > self.threshold)[0] + 2 * w_size
+        return anomalias.tolist(), divergencias.tolist()
+    
+    def _faixa_serie(self, dados):
+        """Faixa global da série (expandida quando degenerada), para bordas fixas."""
+        minimo, maximo = np.min(dados), np.max(dados)
+        if minimo == maximo:
+            minimo, maximo = minimo - 0.5, maximo + 0.5
+        return minimo, maximo
+    
+    def detectar_multiescala(self, serie_temporal, tamanhos_janela):
+        """
+        Scores para vários tamanhos de janela em uma única varredura.
         
-    def detectar(self, serie_temporal):
+        A série é binada uma vez (bordas fixas na faixa global, como no método
+        'deslizante') e uma única tabela de contagens acumuladas serve a todas
+        as escalas; cada escala custa apenas o cálculo de W em lote.
+        
+        Args:
+            serie_temporal (array-like): Dados da série temporal
+            tamanhos_janela (list): Tamanhos de janela w a avaliar
+            
+        Returns:
+            np.ndarray: Matriz (n_escalas, n_pontos); a linha k equivale a
+            `detectar(..., metodo='deslizante')` com tamanho_janela = w_k
+            (zeros no aquecimento)
+        """
+        if not self.usar_w or self.estimador != 'histograma':
+            raise ValueError("A varredura multiescala requer usar_w=True e estimador='histograma'")
+        tamanhos = np.atleast_1d(tamanhos_janela)
+        if (tamanhos.ndim != 1 or tamanhos.dtype.kind not in 'iuf' or np.any(tamanhos <= 0)
+                or np.any(tamanhos != np.floor(tamanhos))):
+            raise ValueError("Cada tamanho de janela deve ser um inteiro positivo")
+        dados = np.asarray(serie_temporal, dtype=np.float64).ravel()
+        n = len(dados)
+        indices = indices_bins_uniformes(dados, *self._faixa_serie(dados), self.BINS)
+        acumulado = contagens_acumuladas(indices, self.BINS)
+        # Coluna j = janelas terminando em j; o score do ponto i usa as amostras até i-1
+        scores = w_multiescala(acumulado, tamanhos.astype(np.intp))[:, :n]
+        return np.nan_to_num(scores, nan=0.0)
+        
+    def detectar(self, serie_temporal, metodo='janela', tamanho_bloco=65536):
         """
         Processa uma série temporal e retorna índices de anomalias.
         
         Args:
             serie_temporal (array-like): Dados da série temporal
+            metodo (str): 'janela' (laço janela a janela), 'vetorizado'
+                (histogramas e divergências de todas as janelas em lote,
+                com os mesmos resultados) ou 'deslizante' (bordas fixas na
+                faixa da série e histogramas incrementais, O(1) por ponto)
+            tamanho_bloco (int): Janelas processadas por bloco no modo vetorizado
             
         Returns:
             list: Índices onde anomalias foram detectadas
             list: Valores de divergência calculados
         """
         dados = np.array(serie_temporal)
+        if metodo == 'vetorizado':
+            anomalias, divergencias = self._detectar_vetorizado(dados.astype(np.float64), tamanho_bloco)
+            self.historico_divergencias = divergencias
+            return anomalias, divergencias
+        if metodo == 'deslizante':
+            anomalias, divergencias = self._detectar_deslizante(dados.astype(np.float64))
+            self.historico_divergencias = divergencias
+            return anomalias, divergencias
+        if metodo != 'janela':
+            raise ValueError(f"Método desconhecido: {metodo}")
         n = len(dados)
         anomalias = []
         divergencias = [0.0] * self.tamanho_janela # Padding inicial
@@ -95,3 +242,175 @@ class DetectorAnomalias:
                 
         self.historico_divergencias = divergencias
         return anomalias, divergencias
+
+
+class DetectorAnomaliasOnline:
+    """
+    Versão em fluxo (push) do `DetectorAnomalias` com memória constante.
+    
+    Compara a janela de referência [i-2w+1 : i-w+1] com a de teste
+    [i-w+1 : i+1] a cada nova amostra i, usando bordas de bins fixas e um
+    `HistogramaDeslizante` (buffers circulares e W incremental). O histórico
+    de scores é opcional e limitado a `tamanho_historico` entradas.
+    """
+    
+    def __init__(self, bordas, tamanho_janela=50, threshold=0.1, tamanho_historico=None):
+        self.tamanho_janela = tamanho_janela
+        self.threshold = threshold
+        self.histograma = HistogramaDeslizante(bordas, tamanho_janela)
+        self.historico_divergencias = deque(maxlen=tamanho_historico) if tamanho_historico else None
+        self.n_anomalias = 0
+        self.ultima_anomalia = None
+        
+    @property
+    def n_observacoes(self):
+        return self.histograma.n_observacoes
+        
+    def _registrar(self, score, indice):
+        if self.historico_divergencias is not None:
+            self.historico_divergencias.append(score)
+        if score > self.threshold:
+            self.n_anomalias += 1
+            self.ultima_anomalia = indice
+        
+    def atualizar(self, valor):
+        """
+        Processa uma amostra.
+        
+        Returns:
+            float | None: Divergência W atual, ou None enquanto as janelas
+            não estão completas
+        """
+        score = self.histograma.empurrar(valor)
+        if score is not None:
+            self._registrar(score, self.n_observacoes - 1)
+        return score
+        
+    def atualizar_lote(self, valores):
+        """
+        Processa várias amostras em ordem.
+        
+        Returns:
+            np.ndarray: Divergência após cada amostra (NaN no aquecimento)
+        """
+        inicio = self.n_observacoes
+        scores = self.histograma.empurrar_lote(valores)
+        posicoes = np.flatnonzero(~np.isnan(scores))
+        for posicao, score in zip(posicoes.tolist(), scores[posicoes].tolist()):
+            self._registrar(score, inicio + posicao)
+        return scores
+        
+    def e_anomalia(self, score):
+        """Indica se um score retornado por `atualizar` excede o threshold."""
+        return score is not None and score > self.threshold
+
+
+class DetectorAnomaliasMultiSerie:
+    """
+    Detector para muitas séries alinhadas `(n_series, n_pontos)` pontuadas em
+    um único pipeline NumPy.
+    
+    Usa as mesmas janelas de `DetectorAnomalias` (referência [i-2w : i-w] vs
+    teste [i-w : i]) com bordas fixas por série. Os histogramas de todas as
+    janelas vêm de uma soma cumulativa das contagens por bin, e W é calculada
+    em lote para todas as séries. Os temporários (tabela acumulada e
+    histogramas das janelas) são limitados por `elementos_bloco`: as séries
+    são processadas em grupos e, quando uma série sozinha excede o limite,
+    em blocos de tempo com 2w pontos de sobreposição. Para limitar também os
+    scores, passe os dados a `detectar` em blocos.
+    """
+    
+    BINS = 10
+    
+    def __init__(self, tamanho_janela=50, threshold=0.1, elementos_bloco=2**20):
+        self.tamanho_janela = tamanho_janela
+        self.threshold = threshold
+        self.elementos_bloco = elementos_bloco
+        
+    def _faixas(self, dados):
+        """Faixa (mínimo, máximo) de cada série, expandida quando degenerada."""
+        minimo, maximo = np.min(dados, axis=1), np.max(dados, axis=1)
+        iguais = minimo == maximo
+        return np.where(iguais, minimo - 0.5, minimo), np.where(iguais, maximo + 0.5, maximo)
+        
+    def _pontuar(self, dados, minimo, maximo):
+        """Scores das posições [2w, n) de cada série, em blocos de séries e de tempo."""
+        w_size = self.tamanho_janela
+        total = 2 * w_size
+        n_series, n = dados.shape
+        scores = np.empty((n_series, max(n - total, 0)))
+        if n <= total:
+            return scores
+        # Linhas de tabela acumulada por bloco; cada bloco de tempo carrega 2w + 1 linhas extras
+        linhas = max(1, self.elementos_bloco // self.BINS)
+        passo_tempo = max(1, min(n - total, linhas - total - 1))
+        passo_series = max(1, linhas // (passo_tempo + total + 1))
+        for s0 in range(0, n_series, passo_series):
+            s1 = min(n_series, s0 + passo_series)
+            for i0 in range(total, n, passo_tempo):
+                i1 = min(n, i0 + passo_tempo)
+                indices = indices_bins_uniformes(dados[s0:s1, i0 - total:i1], minimo[s0:s1],
+                                                 maximo[s0:s1], self.BINS)
+                acumulado = contagens_acumuladas(indices, self.BINS)
+                # A última janela (fim em i1) pertence ao índice i1, pontuado no próximo bloco
+                scores[s0:s1, i0 - total:i1 - total] = w_janelas_adjacentes(acumulado, w_size)[:, :-1]
+        return scores
+    
+    def pontuar(self, dados, faixas=None):
+        """
+        Matriz densa `(n_series, n_pontos)` de divergências (zeros no aquecimento).
+        
+        Args:
+            dados (array-like): Matriz `(n_series, n_pontos)`
+            faixas (tuple, optional): Vetores (mínimo, máximo) das bordas por
+                série; por padrão a faixa de cada série
+        """
+        dados = np.asarray(dados, dtype=np.float64)
+        minimo, maximo = faixas if faixas is not None else self._faixas(dados)
+        divergencias = np.zeros(dados.shape)
+        divergencias[:, 2 * self.tamanho_janela:] = self._pontuar(dados, np.asarray(minimo),
+                                                                  np.asarray(maximo))
+        return divergencias
+        
+    def detectar(self, dados, faixas=None):
+        """
+        Detecta anomalias em todas as séries.
+        
+        Args:
+            dados: Matriz `(n_series, n_pontos)` (ndarray ou lista de linhas)
+                ou iterável de blocos alinhados `(n_series, n_bloco)` (p.ex.
+                uma lista de blocos ou um gerador); entre blocos são mantidos
+                apenas os últimos 2w pontos de cada série
+            faixas (tuple, optional): Vetores (mínimo, máximo) das bordas por
+                série; por padrão a faixa de cada série na matriz ou no
+                primeiro bloco (valores posteriores fora dela vão para os
+                bins extremos)
+            
+        Returns:
+            list: Tuplas (serie, indice, score) com score acima do threshold,
+            ordenadas por série e depois por índice
+        """
+        if isinstance(dados, np.ndarray) or (isinstance(dados, (list, tuple))
+                                             and (len(dados) == 0 or np.ndim(dados[0]) < 2)):
+            dados = [dados]
+        w_size = self.tamanho_janela
+        anomalias = []
+        cauda = None
+        inicio = 0 # Índice global da primeira coluna do buffer
+        for bloco in dados:
+            bloco = np.asarray(bloco, dtype=np.float64)
+            if faixas is None:
+                faixas = self._faixas(bloco)
+            minimo, maximo = np.asarray(faixas[0]), np.asarray(faixas[1])
+            buffer = bloco if cauda is None else np.concatenate([cauda, bloco], axis=1)
+            n = buffer.shape[1]
+            if n > 2 * w_size:
+                scores = self._pontuar(buffer, minimo, maximo)
+                series, posicoes = np.nonzero(scores > self.threshold)
+                anomalias.extend(zip(series.tolist(), (posicoes + inicio + 2 * w_size).tolist(),
+                                     scores[series, posicoes].tolist()))
+            manter = min(n, 2 * w_size)
+            cauda = buffer[:, n - manter:]
+            inicio += n - manter
+        anomalias.sort(key=lambda anomalia: anomalia[:2])
+        return anomalias
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Divergência W - Detector de Pontos de Mudança
+Autor: Luiz Tiago Wilcke
+"""
+
+import numpy as np
+from ..core.matematica_base import EPSILON_PADRAO, LAMBDA_PADRAO, calcular_w_lote
+from ..core.histograma_acumulado import contagens_acumuladas
+
+
+class DetectorPontosMudanca:
+    """
+    Segmentação offline de séries pela Divergência W.
+
+    Cada segmento [a, b) custa -(b - a) · W(h_ab, h_global): segmentos cuja
+    distribuição se afasta da distribuição global da série reduzem o custo,
+    e cada ponto de mudança paga `penalidade`. Os histogramas usam bins por
+    quantis globais e vêm de uma tabela de contagens acumuladas, de modo que o
+    custo de qualquer segmento candidato é O(bins).
+
+    Métodos:
+        'pelt': busca exata com poda (PELT); 'exato' desliga a poda (O(n²))
+        'binaria': segmentação binária gulosa
+    """
+
+    METODOS = ('pelt', 'exato', 'binaria')
+
+    def __init__(self, n_bins=10, tamanho_minimo=20, penalidade=None, metodo='pelt', passo=1,
+                 epsilon=EPSILON_PADRAO, lambda_suavizacao=LAMBDA_PADRAO):
+        """
+        Args:
+            n_bins (int): Número de bins (quantis globais da série)
+            tamanho_minimo (int): Tamanho mínimo de cada segmento
+            penalidade (float, optional): Custo por ponto de mudança; por
+                padrão n_bins · log(n) / 2
+            metodo (str): 'pelt', 'exato' ou 'binaria'
+            passo (int): Resolução da busca PELT/exata. Com passo > 1 os
+                pontos candidatos ficam numa grade de múltiplos de `passo`
+                (custo ~passo² menor) e cada ponto encontrado é refinado
+                localmente à resolução de 1 amostra
+        """
+        if metodo not in self.METODOS:
+            raise ValueError(f"Método desconhecido: {metodo}. Use um de {self.METODOS}")
+        if tamanho_minimo < 1:
+            raise ValueError("tamanho_minimo deve ser positivo")
+        self.n_bins = n_bins
+        self.tamanho_minimo = tamanho_minimo
+        self.penalidade = penalidade
+        self.metodo = metodo
+        self.passo = max(1, int(passo))
+        self.epsilon = epsilon
+        self.lambda_suavizacao = lambda_suavizacao
+        self.custo_total = None
+
+    def _preparar(self, serie):
+        """Bins por quantis globais e tabela de contagens acumuladas da série."""
+        dados = np.asarray(serie, dtype=np.float64).ravel()
+        bordas = np.quantile(dados, np.linspace(0, 1, self.n_bins + 1)[1:-1])
+        indices = np.searchsorted(bordas, dados, side='right')
+        self._acumulado = contagens_acumuladas(indices, self.n_bins)
+        self._global = self._acumulado[-1].astype(np.float64)
+        return len(dados)
+
+    def custos_segmentos(self, inicios, fins):
+        """Custo -(b - a) · W(h_ab, h_global) de cada segmento [inicios[i], fins[i])."""
+        inicios, fins = np.asarray(inicios), np.asarray(fins)
+        contagens = (self._acumulado[fins] - self._acumulado[inicios]).astype(np.float64)
+        w = calcular_w_lote(contagens, self._global, self.epsilon, self.lambda_suavizacao)
+        return -(fins - inicios) * w
+
+    def _pelt(self, n, penalidade, podar):
+        m = self.tamanho_minimo
+        # Fronteiras admissíveis: 0, n e a grade de resolução `passo` em [m, n - m]
+        grade = np.arange(m, n - m + 1)
+        grade = np.concatenate([[0], grade[grade % self.passo == 0], [n]]).astype(np.intp)
+        custo_otimo = np.full(len(grade), np.inf)
+        custo_otimo[0] = -penalidade
+        anterior = np.zeros(len(grade), dtype=np.intp)
+        candidatos = np.zeros(0, dtype=np.intp) # Posições na grade
+        proximo = 0 # Próxima posição da grade a tornar-se candidata
+        for j in range(1, len(grade)):
+            t = grade[j]
+            while proximo < j and t - grade[proximo] >= m:
+                # O início grade[proximo] passa a deixar um segmento de tamanho mínimo
+                candidatos = np.append(candidatos, proximo)
+                proximo += 1
+            if len(candidatos) == 0:
+                continue
+            inicios = grade[candidatos]
+            custos = custo_otimo[candidatos] + self.custos_segmentos(inicios, np.full(len(inicios), t))
+            melhor = np.argmin(custos)
+            custo_otimo[j] = custos[melhor] + penalidade
+            anterior[j] = candidatos[melhor]
+            if podar:
+                # Inícios que não podem mais ser ótimos (C(a, t) + C(t, b) <= C(a, b))
+                candidatos = candidatos[custos <= custo_otimo[j]]
+
+        pontos = []
+        j = len(grade) - 1
+        while j > 0:
+            j = anterior[j]
+            if j > 0:
+                pontos.append(int(grade[j]))
+        pontos = sorted(pontos)
+        if self.passo > 1:
+            pontos = self._refinar(pontos, n)
+        return pontos, self._custo_particao(pontos, n, penalidade)
+
+    def _refinar(self, pontos, n):
+        """Ajusta cada ponto dentro de ±passo minimizando o custo dos dois segmentos vizinhos."""
+        m = self.tamanho_minimo
+        fronteiras = [0] + list(pontos) + [n]
+        for k in range(1, len(fronteiras) - 1):
+            a, b = fronteiras[k - 1], fronteiras[k + 1]
+            cortes = np.arange(max(a + m, fronteiras[k] - self.passo + 1),
+                               min(b - m, fronteiras[k] + self.passo - 1) + 1)
+            if len(cortes):
+                custos = (self.custos_segmentos(np.full(len(cortes), a), cortes)
+                          + self.custos_segmentos(cortes, np.full(len(cortes), b)))
+                fronteiras[k] = int(cortes[np.argmin(custos)])
+        return fronteiras[1:-1]
+
+    def _custo_particao(self, pontos, n, penalidade):
+        fronteiras = np.array([0] + list(pontos) + [n])
+        return float(np.sum(self.custos_segmentos(fronteiras[:-1], fronteiras[1:])) + penalidade * len(pontos))
+
+    def _segmentacao_binaria(self, n, penalidade):
+        m = self.tamanho_minimo
+        pontos = []
+        custo_total = float(self.custos_segmentos([0], [n])[0])
+        pendentes = [(0, n)]
+        while pendentes:
+            a, b = pendentes.pop()
+            if b - a < 2 * m:
+                continue
+            cortes = np.arange(a + m, b - m + 1)
+            ganho = (self.custos_segmentos([a], [b])[0]
+                     - self.custos_segmentos(np.full(len(cortes), a), cortes)
+                     - self.custos_segmentos(cortes, np.full(len(cortes), b)))
+            melhor = np.argmax(ganho)
+            if ganho[melhor] > penalidade:
+                t = int(cortes[melhor])
+                pontos.append(t)
+                custo_total -= ganho[melhor] - penalidade
+                pendentes.extend([(a, t), (t, b)])
+        return sorted(pontos), float(custo_total)
+
+    def detectar(self, serie):
+        """
+        Localiza os pontos de mudança da série.
+
+        Args:
+            serie (array-like): Série temporal
+
+        Returns:
+            list: Índices onde começa cada novo segmento (ordenados)
+        """
+        n = self._preparar(serie)
+        if n < 2 * self.tamanho_minimo:
+            self.custo_total = 0.0
+            return []
+        penalidade = self.penalidade if self.penalidade is not None else self.n_bins * np.log(n) / 2
+        if self.metodo == 'binaria':
+            pontos, self.custo_total = self._segmentacao_binaria(n, penalidade)
+        else:
+            pontos, self.custo_total = self._pelt(n, penalidade, podar=self.metodo == 'pelt')
+        return pontos
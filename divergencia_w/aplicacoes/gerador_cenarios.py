@@ -4,63 +4,148 @@ Divergência W - Gerador de Cenários para Testes
 Autor: Luiz Tiago Wilcke
 """
 
+import os
 import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Regimes financeiros (fração dos dias, média e volatilidade diárias)
+REGIMES_FINANCEIROS = (
+    (0.4, 0.0005, 0.01),   # Calmo (Bull Market constante): média positiva leve, baixa vol
+    (0.2, -0.002, 0.04),   # Crise (Alta volatilidade, média negativa): Crash
+    (0.4, 0.001, 0.015),   # Recuperação (Volatilidade média)
+)
+
+
+def _gerar_retornos_regimes(rng, n_cenarios, n_dias):
+    """Retornos `(n_cenarios, n_dias)` com os regimes calmo -> crise -> recuperação."""
+    fim_calmo = int(round(REGIMES_FINANCEIROS[0][0] * n_dias))
+    fim_crise = fim_calmo + int(round(REGIMES_FINANCEIROS[1][0] * n_dias))
+    limites = (0, fim_calmo, min(fim_crise, n_dias), n_dias)
+    media = np.empty(n_dias)
+    volatilidade = np.empty(n_dias)
+    for (_, mu, sigma), inicio, fim in zip(REGIMES_FINANCEIROS, limites[:-1], limites[1:]):
+        media[inicio:fim] = mu
+        volatilidade[inicio:fim] = sigma
+    return rng.normal(media, volatilidade, size=(n_cenarios, n_dias))
+
+
+def _precos_de_retornos(retornos, preco_inicial):
+    """Preços a partir de retornos log: P_t = P_0 · exp(Σ r), com P_0 na primeira coluna."""
+    log_precos = np.zeros(retornos.shape[:-1] + (retornos.shape[-1] + 1,))
+    np.cumsum(retornos, axis=-1, out=log_precos[..., 1:])
+    return preco_inicial * np.exp(log_precos)
+
+
+def _gerar_bloco_financeiro(semente, n_cenarios, n_dias, preco_inicial):
+    """Tarefa do pool: um bloco de cenários a partir de uma semente filha."""
+    retornos = _gerar_retornos_regimes(np.random.default_rng(semente), n_cenarios, n_dias)
+    return _precos_de_retornos(retornos, preco_inicial), retornos
+
 
 class GeradorCenarios:
-    """Gera dados sintéticos com anomalias e mudanças de padrão controladas."""
+    """
+    Gera dados sintéticos com anomalias e mudanças de padrão controladas.
     
+    Todos os geradores usam `np.random.Generator` local: `seed` aceita um
+    inteiro, uma `np.random.SeedSequence` ou um `Generator` já criado, e o
+    estado global do NumPy não é alterado.
+    """
+        
     @staticmethod
-    def gerar_serie_com_anomalia(n_pontos=1000, ponto_anomalia=500, duracao=50):
+    def gerar_serie_com_anomalia(n_pontos=1000, ponto_anomalia=500, duracao=50, seed=42):
         """Série temporal normal que sofre uma perturbação temporária."""
-        np.random.seed(42)
+        rng = np.random.default_rng(seed)
         # Regime normal: Ruído gaussiano
-        dados = np.random.normal(0, 1, n_pontos)
+        dados = rng.normal(0, 1, n_pontos)
         
         # Inserir anomalia: Aumento de variância e média
         fim_anomalia = min(n_pontos, ponto_anomalia + duracao)
-        dados[ponto_anomalia:fim_anomalia] = np.random.normal(2, 3, fim_anomalia - ponto_anomalia)
+        dados[ponto_anomalia:fim_anomalia] = rng.normal(2, 3, fim_anomalia - ponto_anomalia)
         
         return dados
         
     @staticmethod
-    def gerar_data_drift(n_amostras=1000, intensidade_drift=0.5):
+    def gerar_data_drift(n_amostras=1000, intensidade_drift=0.5, seed=100):
         """Gera dataset de treinamento (baseline) e produção (com drift)."""
-        np.random.seed(100)
+        rng = np.random.default_rng(seed)
         
         # Baseline: Mistura de duas gaussianas
         baseline = np.concatenate([
-            np.random.normal(-2, 1, n_amostras // 2),
-            np.random.normal(2, 1, n_amostras // 2)
+            rng.normal(-2, 1, n_amostras // 2),
+            rng.normal(2, 1, n_amostras // 2)
         ])
         
         # Produção com Drift: As médias se deslocam
         producao = np.concatenate([
-            np.random.normal(-2 + intensidade_drift, 1, n_amostras // 2),
-            np.random.normal(2 + intensidade_drift, 1.5, n_amostras // 2) # Aumenta variância também
+            rng.normal(-2 + intensidade_drift, 1, n_amostras // 2),
+            rng.normal(2 + intensidade_drift, 1.5, n_amostras // 2) # Aumenta variância também
         ])
         
         return baseline, producao
         
     @staticmethod
-    def gerar_dados_financeiros_sinteticos(n_dias=1000):
-        """Simula preços de ativos com mudanças de regime (calmo -> crise -> calmo)."""
-        np.random.seed(2026)
+    def gerar_dados_financeiros_sinteticos(n_dias=1000, seed=2026, preco_inicial=100):
+        """
+        Simula preços de ativos com mudanças de regime (calmo -> crise -> calmo),
+        com 40% / 20% / 40% dos dias em cada regime.
         
-        # Regime 1: Calmo (Bull Market constante)
-        retornos_calmo = np.random.normal(0.0005, 0.01, 400) # Média positiva leve, baixa vol
+        Returns:
+            tuple: Preços (n_dias + 1,) e retornos log (n_dias,)
+        """
+        retornos = _gerar_retornos_regimes(np.random.default_rng(seed), 1, n_dias)[0]
+        # Reconstrói preços pela soma acumulada dos retornos log
+        return _precos_de_retornos(retornos, preco_inicial), retornos
+        
+    @staticmethod
+    def gerar_cenarios_financeiros(n_cenarios, n_dias=1000, seed=2026, preco_inicial=100):
+        """
+        Gera vários cenários financeiros de uma vez.
+        
+        Returns:
+            tuple: Preços (n_cenarios, n_dias + 1) e retornos (n_cenarios, n_dias)
+        """
+        retornos = _gerar_retornos_regimes(np.random.default_rng(seed), n_cenarios, n_dias)
+        return _precos_de_retornos(retornos, preco_inicial), retornos
+        
+    @staticmethod
+    def gerar_cenarios_financeiros_paralelo(n_cenarios, n_dias=1000, tamanho_bloco=1000, seed=2026,
+                                            n_processos=None, preco_inicial=100):
+        """
+        Gera grandes conjuntos de cenários em blocos, distribuídos entre processos.
         
-        # Regime 2: Crise (Alta volatilidade, média negativa)
-        retornos_crise = np.random.normal(-0.002, 0.04, 200) # Crash
+        Cada bloco usa um fluxo independente obtido de
+        `SeedSequence(seed).spawn`, então o resultado depende apenas de `seed`
+        e `tamanho_bloco`, nunca do número de processos ou da ordem de
+        execução. Os blocos são produzidos em ordem, com no máximo
+        2·n_processos blocos em andamento para limitar a memória.
         
-        # Regime 3: Recuperação (Volatilidade média)
-        retornos_recup = np.random.normal(0.001, 0.015, 400)
+        Args:
+            n_cenarios (int): Total de cenários
+            n_dias (int): Dias por cenário
+            tamanho_bloco (int): Cenários por bloco
+            seed (int | SeedSequence): Semente raiz
+            n_processos (int, optional): Processos (padrão: núcleos
+                disponíveis); 1 gera no processo atual
         
-        retornos = np.concatenate([retornos_calmo, retornos_crise, retornos_recup])
+        Yields:
+            tuple: Preços (n_bloco, n_dias + 1) e retornos (n_bloco, n_dias)
+        """
+        raiz = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        tamanhos = [min(tamanho_bloco, n_cenarios - inicio) for inicio in range(0, n_cenarios, tamanho_bloco)]
+        sementes = raiz.spawn(len(tamanhos))
+        n_processos = n_processos or os.cpu_count() or 1
+        if n_processos <= 1:
+            for semente, tamanho in zip(sementes, tamanhos):
+                yield _gerar_bloco_financeiro(semente, tamanho, n_dias, preco_inicial)
+            return
         
-        # Reconstrói preços
-        preco_inicial = 100
-        precos = [preco_inicial]
-        for r in retornos:
-            precos.append(precos[-1] * np.exp(r))
-            
-        return np.array(precos), np.array(retornos)
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            pendentes = deque()
+            for semente, tamanho in zip(sementes, tamanhos):
+                pendentes.append(executor.submit(_gerar_bloco_financeiro, semente, tamanho,
+                                                 n_dias, preco_inicial))
+                if len(pendentes) >= 2 * n_processos:
+                    yield pendentes.popleft().result()
+            while pendentes:
+                yield pendentes.popleft().result()
@@ -4,8 +4,88 @@ Divergência W - Monitor de Data Drift
 Autor: Luiz Tiago Wilcke
 """
 
+import os
+import struct
+import zlib
 import numpy as np
-from ..core.matematica_base import calcular_w, calcular_kl
+from ..core.matematica_base import calcular_divergencias, calcular_divergencias_lote
+from ..core.histograma_acumulado import indices_bins_uniformes
+
+
+def _distribuicao_contagens(contagens, bordas):
+    """Distribuição normalizada a partir de contagens, como `np.histogram(..., density=True)`."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hist = contagens / np.diff(bordas) / np.sum(contagens)
+    return np.maximum(hist, 1e-10) / np.sum(np.maximum(hist, 1e-10))
+
+
+class AcumuladorDrift:
+    """
+    Estado de drift mesclável: contagens por bin de bordas fixas.
+    
+    Ingere micro-lotes com `adicionar`, combina-se com acumuladores de outros
+    processos ou máquinas com `merge` e serializa para um blob binário compacto
+    (`para_bytes`/`de_bytes`), de modo que o drift global é obtido reduzindo
+    vetores de contagens em vez de transportar amostras.
+    """
+    
+    _MAGICO = b'DWAC'
+    _VERSAO = 1
+    # Mágico, versão, número de bins e total de amostras (little-endian)
+    _CABECALHO = struct.Struct('<4sHIQ')
+    
+    def __init__(self, bordas):
+        self.bordas = np.array(bordas, dtype=np.float64)
+        if self.bordas.ndim != 1 or len(self.bordas) < 2:
+            raise ValueError("Bordas devem ser um vetor 1-D com ao menos dois valores")
+        self.contagens = np.zeros(len(self.bordas) - 1, dtype=np.int64)
+        self.n_amostras = 0
+        
+    def adicionar(self, dados):
+        """Acumula um micro-lote (valores fora das bordas contam só em `n_amostras`)."""
+        dados = np.asarray(dados, dtype=np.float64).ravel()
+        contagens, _ = np.histogram(dados, bins=self.bordas)
+        self.contagens += contagens
+        self.n_amostras += len(dados)
+        return self
+        
+    def merge(self, outro):
+        """Incorpora as contagens de outro acumulador com as mesmas bordas."""
+        if not np.array_equal(self.bordas, outro.bordas):
+            raise ValueError("Acumuladores com bordas diferentes não podem ser combinados")
+        self.contagens += outro.contagens
+        self.n_amostras += outro.n_amostras
+        return self
+        
+    def distribuicao(self):
+        """Distribuição de probabilidade das contagens acumuladas."""
+        return _distribuicao_contagens(self.contagens, self.bordas)
+        
+    def para_bytes(self):
+        """Serializa para bytes: cabeçalho, bordas (float64) e contagens (int64)."""
+        cabecalho = self._CABECALHO.pack(self._MAGICO, self._VERSAO, len(self.contagens), self.n_amostras)
+        return cabecalho + self.bordas.astype('<f8').tobytes() + self.contagens.astype('<i8').tobytes()
+        
+    @classmethod
+    def de_bytes(cls, dados):
+        """Reconstrói um acumulador a partir de `para_bytes`."""
+        dados = bytes(dados)
+        tamanho_cabecalho = cls._CABECALHO.size
+        if len(dados) < tamanho_cabecalho:
+            raise ValueError("Blob truncado")
+        magico, versao, n_bins, n_amostras = cls._CABECALHO.unpack_from(dados)
+        if magico != cls._MAGICO:
+            raise ValueError("Blob não é um AcumuladorDrift")
+        if versao != cls._VERSAO:
+            raise ValueError(f"Versão de blob não suportada: {versao}")
+        if len(dados) != tamanho_cabecalho + 8 * (2 * n_bins + 1):
+            raise ValueError("Tamanho do blob incompatível com o cabeçalho")
+        bordas = np.frombuffer(dados, dtype='<f8', count=n_bins + 1, offset=tamanho_cabecalho)
+        acumulador = cls(bordas)
+        acumulador.contagens[:] = np.frombuffer(dados, dtype='<i8', count=n_bins,
+                                                offset=tamanho_cabecalho + 8 * (n_bins + 1))
+        acumulador.n_amostras = n_amostras
+        return acumulador
 
 class MonitorDataDrift:
     """
@@ -13,23 +93,71 @@ class MonitorDataDrift:
     com um baseline (referência).
     """
     
-    def __init__(self, baseline_data):
+    BINS = 20
+    # Expoente (em meias-vidas) a partir do qual os pesos inflados são reescalados
+    EXPOENTE_MAXIMO = 512
+    
+    def __init__(self, baseline_data, meia_vida=None):
+        """
+        Args:
+            baseline_data (array-like): Dados de referência
+            meia_vida (float, optional): Meia-vida do histograma de produção com
+                decaimento exponencial (`atualizar`), em amostras ou nas
+                unidades de tempo informadas a `atualizar`
+        """
         self.baseline_data = np.array(baseline_data)
+        # Bordas fixas, calculadas uma única vez a partir do baseline
+        self.bordas = self._calcular_bordas(self.BINS)
         self.baseline_dist = self._calcular_distribuicao(self.baseline_data)
+        self._inicializar_decaimento(meia_vida)
         
-    def _calcular_distribuicao(self, dados, bins=20):
-        """Gera distribuição normalizada a partir dos dados."""
-        # Usa range fixo baseado no baseline para garantir comparabilidade
+    @classmethod
+    def de_baseline(cls, bordas, baseline_dist, meia_vida=None):
+        """
+        Cria um monitor a partir de bordas e distribuição já calculadas (p.ex.
+        de `carregar_baseline`), sem os dados brutos do baseline.
+        """
+        bordas = np.asarray(bordas, dtype=np.float64)
+        baseline_dist = np.asarray(baseline_dist, dtype=np.float64)
+        if bordas.ndim != 1 or baseline_dist.shape != (len(bordas) - 1,):
+            raise ValueError(f"Bordas {bordas.shape} incompatíveis com a distribuição {baseline_dist.shape}")
+        monitor = cls.__new__(cls)
+        monitor.baseline_data = None
+        monitor.bordas = bordas
+        monitor.baseline_dist = baseline_dist
+        monitor._inicializar_decaimento(meia_vida)
+        return monitor
+        
+    def _inicializar_decaimento(self, meia_vida):
+        # Histograma decaído mantido com pesos inflados 2^((t - t_ref) / meia_vida):
+        # novas amostras recebem peso crescente em vez de decair todo o histograma
+        self.meia_vida = meia_vida
+        self._contagens_decaidas = np.zeros(len(self.bordas) - 1)
+        self._massa_decaida = 0.0
+        self._tempo_referencia = 0.0
+        self.tempo_atual = 0.0
+        
+    def _calcular_bordas(self, bins):
+        """Bordas com range fixo baseado no baseline para garantir comparabilidade."""
+        if self.baseline_data is None:
+            raise ValueError("Monitor criado sem dados brutos do baseline: use as bordas salvas")
         range_min = np.min(self.baseline_data)
         range_max = np.max(self.baseline_data)
         
         # Margem de segurança
         margem = (range_max - range_min) * 0.1
-        bins_edges = np.linspace(range_min - margem, range_max + margem, bins + 1)
+        return np.linspace(range_min - margem, range_max + margem, bins + 1)
         
+    def _calcular_distribuicao(self, dados, bins=None):
+        """Gera distribuição normalizada a partir dos dados."""
+        bins_edges = self.bordas if bins in (None, len(self.bordas) - 1) else self._calcular_bordas(bins)
         hist, _ = np.histogram(dados, bins=bins_edges, density=True)
         return np.maximum(hist, 1e-10) / np.sum(np.maximum(hist, 1e-10))
         
+    def criar_acumulador(self):
+        """Cria um `AcumuladorDrift` com as bordas deste monitor (para micro-lotes e merge)."""
+        return AcumuladorDrift(self.bordas)
+        
     def verificar_drift(self, novos_dados):
         """
         Calcula o score de drift para novos dados.
@@ -42,12 +170,86 @@ class MonitorDataDrift:
         """
         novos_dados = np.array(novos_dados)
         prod_dist = self._calcular_distribuicao(novos_dados)
+        return self._resultado_drift(prod_dist, len(novos_dados))
         
-        score_w = calcular_w(self.baseline_dist, prod_dist)
-        try:
-            score_kl = calcular_kl(self.baseline_dist, prod_dist)
-        except:
-            score_kl = float('inf')
+    def atualizar(self, novos_dados, tempo=None):
+        """
+        Incorpora um lote ao histograma de produção com decaimento exponencial,
+        em O(amostras + bins), sem guardar dados brutos.
+        
+        Args:
+            novos_dados (array-like): Lote de novos dados de produção
+            tempo (float, optional): Instante do lote (não decrescente). Se
+                omitido, cada amostra avança o relógio em uma unidade
+        """
+        if not self.meia_vida:
+            raise ValueError("Defina meia_vida no construtor para usar o histograma com decaimento")
+        dados = self._valores_histograma(novos_dados)
+        if tempo is None:
+            tempos = self.tempo_atual + np.arange(1, len(dados) + 1)
+        else:
+            if tempo < self.tempo_atual:
+                raise ValueError(f"Tempo {tempo} anterior ao último registrado ({self.tempo_atual})")
+            tempos = np.full(len(dados), float(tempo))
+        if len(tempos) == 0:
+            return self
+        self.tempo_atual = float(tempos[-1])
+        
+        if (self.tempo_atual - self._tempo_referencia) / self.meia_vida > self.EXPOENTE_MAXIMO:
+            # Reescala preguiçosa: traz os pesos para a referência no instante atual
+            fator = 2.0 ** (-(self.tempo_atual - self._tempo_referencia) / self.meia_vida)
+            self._contagens_decaidas *= fator
+            self._massa_decaida *= fator
+            self._tempo_referencia = self.tempo_atual
+        pesos = 2.0 ** ((tempos - self._tempo_referencia) / self.meia_vida)
+        contagens, _ = np.histogram(dados, bins=self.bordas, weights=pesos)
+        self._contagens_decaidas += contagens
+        self._massa_decaida += np.sum(pesos)
+        return self
+        
+    def _valores_histograma(self, dados):
+        """Valores numéricos a histogramar com `self.bordas`."""
+        return np.asarray(dados, dtype=np.float64).ravel()
+        
+    @property
+    def contagens_decaidas(self):
+        """Contagens por bin do histograma com decaimento no instante atual."""
+        return self._contagens_decaidas * 2.0 ** (-(self.tempo_atual - self._tempo_referencia) / self.meia_vida)
+        
+    def verificar_drift_decaido(self):
+        """
+        Drift do histograma de produção com decaimento contra o baseline, a
+        qualquer momento. `tamanho_amostra` é a massa efetiva decaída.
+        
+        Returns:
+            dict: Mesmo formato de `verificar_drift`
+        """
+        if not self.meia_vida:
+            raise ValueError("Defina meia_vida no construtor para usar o histograma com decaimento")
+        # A distribuição é invariante à escala dos pesos inflados
+        prod_dist = _distribuicao_contagens(self._contagens_decaidas, self.bordas)
+        massa = self._massa_decaida * 2.0 ** (-(self.tempo_atual - self._tempo_referencia) / self.meia_vida)
+        return self._resultado_drift(prod_dist, float(massa))
+        
+    def verificar_drift_acumulado(self, acumulador):
+        """
+        Calcula o score de drift a partir de um `AcumuladorDrift` (possivelmente
+        combinado de vários workers), sem as amostras brutas.
+        
+        Returns:
+            dict: Mesmo formato de `verificar_drift`
+        """
+        if not np.array_equal(acumulador.bordas, self.bordas):
+            raise ValueError("Acumulador com bordas diferentes das do monitor")
+        return self._resultado_drift(acumulador.distribuicao(), acumulador.n_amostras)
+        
+    def _resultado_drift(self, prod_dist, tamanho_amostra):
+        """Scores e classificação de severidade para uma distribuição de produção."""
+        # W e KL compartilham a mesma normalização
+        divergencias = calcular_divergencias(self.baseline_dist, prod_dist, metricas=('w', 'kl'))
+        score_w = divergencias['w']
+        # NaN (lote sem distribuição definida) é mantido; só um KL infinito vira inf
+        score_kl = float('inf') if np.isinf(divergencias['kl']) else divergencias['kl']
             
         # Classificação de severidade baseada em heurísticas
         nivel_drift = "Normal"
@@ -62,5 +264,240 @@ class MonitorDataDrift:
             "drift_score_w": score_w,
             "drift_score_kl": score_kl,
             "nivel": nivel_drift,
-            "tamanho_amostra": len(novos_dados)
+            "tamanho_amostra": tamanho_amostra
         }
+
+
+class _VocabularioHash(dict):
+    """Dicionário categoria -> id em que chaves ausentes valem -1 (consulta em laço C via `map`)."""
+    
+    def __missing__(self, chave):
+        return -1
+
+
+def _e_ausente(valor):
+    return valor is None or (isinstance(valor, float) and valor != valor)
+
+
+class MonitorDataDriftCategorico(MonitorDataDrift):
+    """
+    Monitor de drift para features categóricas (strings, inteiros, ...).
+    
+    As categorias do baseline (em ordem de primeira ocorrência) formam um
+    vocabulário em hash e cada lote é mapeado para ids densos com uma única
+    consulta por elemento, feita em C; só os elementos não encontrados passam
+    por Python, uma vez por valor distinto. Valores ausentes (None/NaN) têm um
+    id próprio logo após o vocabulário, categorias não vistas são agrupadas em
+    `n_buckets_overflow` buckets por hash CRC-32 (estável entre processos) e
+    as contagens vêm de `np.bincount`. Categorias e sua forma textual são
+    equivalentes nos dois sentidos (`0` casa com `'0'` e vice-versa). As
+    bordas k ± 0.5 sobre os ids permitem reutilizar o histograma com
+    decaimento e o `AcumuladorDrift` (alimentado com `codificar(lote)`).
+    """
+    
+    def __init__(self, baseline_data, n_buckets_overflow=16, meia_vida=None):
+        self.baseline_data = np.asarray(baseline_data).ravel()
+        categorias = [valor for valor in dict.fromkeys(self.baseline_data.tolist()) if not _e_ausente(valor)]
+        self.vocabulario = np.empty(len(categorias), dtype=object)
+        self.vocabulario[:] = categorias
+        self.id_ausente = len(categorias)
+        self._ids = _VocabularioHash((valor, i) for i, valor in enumerate(categorias))
+        for i, valor in enumerate(categorias):
+            # Forma textual das categorias não textuais (ex.: '0' para 0)
+            if not isinstance(valor, str):
+                self._ids.setdefault(str(valor), i)
+        self.n_buckets_overflow = n_buckets_overflow
+        n_categorias = len(categorias) + 1 + n_buckets_overflow
+        self.bordas = np.arange(n_categorias + 1) - 0.5
+        self.baseline_dist = self._calcular_distribuicao(self.baseline_data)
+        self._inicializar_decaimento(meia_vida)
+        
+    def _id_fora_vocabulario(self, valor):
+        """Id de um valor sem correspondência direta: ausente, forma textual ou overflow."""
+        if _e_ausente(valor):
+            return self.id_ausente
+        texto = str(valor)
+        if not isinstance(valor, str) and texto in self._ids:
+            return self._ids[texto]
+        if self.n_buckets_overflow < 1:
+            raise ValueError("Categorias fora do vocabulário e n_buckets_overflow=0")
+        return self.id_ausente + 1 + zlib.crc32(texto.encode('utf-8')) % self.n_buckets_overflow
+        
+    def codificar(self, dados):
+        """
+        Ids densos: posição no vocabulário, `id_ausente` para None/NaN ou
+        bucket de overflow das categorias novas.
+        """
+        dados = np.asarray(dados).ravel()
+        ids = np.fromiter(map(self._ids.__getitem__, dados.tolist()), dtype=np.intp, count=len(dados))
+        faltantes = np.flatnonzero(ids < 0)
+        if len(faltantes):
+            # Resolve cada valor distinto fora do vocabulário uma única vez
+            outros = dados[faltantes].tolist()
+            resolvidos = {valor: self._id_fora_vocabulario(valor) for valor in dict.fromkeys(outros)}
+            ids[faltantes] = np.fromiter(map(resolvidos.__getitem__, outros), dtype=np.intp,
+                                         count=len(outros))
+        return ids
+        
+    def _calcular_distribuicao(self, dados, bins=None):
+        """Distribuição das categorias (vocabulário + buckets de overflow)."""
+        contagens = np.bincount(self.codificar(dados), minlength=len(self.bordas) - 1)
+        return _distribuicao_contagens(contagens, self.bordas)
+        
+    def _valores_histograma(self, dados):
+        return self.codificar(dados).astype(np.float64)
+
+
+_MAGICO_BASELINE = b'DWBL'
+_VERSAO_BASELINE = 1
+# Mágico, versão, reservado e número de bins; 16 bytes mantêm os arrays alinhados a 8
+_CABECALHO_BASELINE = struct.Struct('<4sHHQ')
+
+
+def salvar_baseline(monitor, caminho):
+    """
+    Salva as bordas e a distribuição do baseline de um `MonitorDataDrift` em
+    um arquivo binário versionado: cabeçalho seguido de bordas e distribuição
+    (float64 little-endian). O vocabulário de `MonitorDataDriftCategorico`
+    não faz parte do formato, então esses monitores são recusados.
+    """
+    if isinstance(monitor, MonitorDataDriftCategorico):
+        raise ValueError("salvar_baseline não suporta MonitorDataDriftCategorico: "
+                         "o vocabulário não seria salvo")
+    bordas = np.asarray(monitor.bordas, dtype='<f8')
+    baseline_dist = np.asarray(monitor.baseline_dist, dtype='<f8')
+    if bordas.ndim != 1 or baseline_dist.shape != (len(bordas) - 1,):
+        raise ValueError(f"Baseline univariado esperado: bordas {bordas.shape} e "
+                         f"distribuição {baseline_dist.shape} incompatíveis")
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(_CABECALHO_BASELINE.pack(_MAGICO_BASELINE, _VERSAO_BASELINE, 0, len(baseline_dist)))
+        arquivo.write(bordas.tobytes())
+        arquivo.write(baseline_dist.tobytes())
+
+
+def carregar_baseline(caminho, meia_vida=None):
+    """
+    Carrega um baseline salvo por `salvar_baseline` sem recalcular nada.
+    
+    Bordas e distribuição são mapeadas com `np.memmap` em modo somente
+    leitura, então processos criados por fork compartilham as mesmas páginas.
+    
+    Returns:
+        MonitorDataDrift: Monitor pronto para `verificar_drift`
+    """
+    tamanho_cabecalho = _CABECALHO_BASELINE.size
+    with open(caminho, 'rb') as arquivo:
+        cabecalho = arquivo.read(tamanho_cabecalho)
+    if len(cabecalho) < tamanho_cabecalho:
+        raise ValueError(f"Arquivo de baseline truncado: {caminho}")
+    magico, versao, _, n_bins = _CABECALHO_BASELINE.unpack(cabecalho)
+    if magico != _MAGICO_BASELINE:
+        raise ValueError(f"Arquivo não é um baseline de drift: {caminho}")
+    if versao != _VERSAO_BASELINE:
+        raise ValueError(f"Versão de baseline não suportada: {versao}")
+    if os.path.getsize(caminho) != tamanho_cabecalho + 8 * (2 * n_bins + 1):
+        raise ValueError(f"Tamanho do arquivo incompatível com o cabeçalho: {caminho}")
+    dados = np.memmap(caminho, dtype='<f8', mode='r', offset=tamanho_cabecalho, shape=(2 * n_bins + 1,))
+    return MonitorDataDrift.de_baseline(dados[:n_bins + 1], dados[n_bins + 1:], meia_vida)
+
+
+class MonitorDataDriftMultivariado:
+    """
+    Monitora o drift de todas as features de um modelo de uma só vez.
+    
+    As bordas de cada feature (faixa do baseline com margem de 10%, como em
+    `MonitorDataDrift`) são calculadas uma única vez; cada lote é binado para
+    todas as colunas em uma passada vetorizada e W/KL de todas as features vêm
+    de uma única chamada em lote.
+    """
+    
+    BINS = 20
+    
+    def __init__(self, baseline_data, nomes_features=None):
+        """
+        Args:
+            baseline_data: Matriz (amostras x features) ou DataFrame
+            nomes_features (list, optional): Nomes das colunas; por padrão as
+                colunas do DataFrame ou feature_0, feature_1, ...
+        """
+        if hasattr(baseline_data, 'columns') and nomes_features is None:
+            nomes_features = [str(coluna) for coluna in baseline_data.columns]
+        dados = self._como_matriz(baseline_data)
+        n_features = dados.shape[1]
+        self.nomes_features = list(nomes_features) if nomes_features is not None else [
+            f"feature_{i}" for i in range(n_features)]
+        if len(self.nomes_features) != n_features:
+            raise ValueError(f"{len(self.nomes_features)} nomes para {n_features} features")
+        
+        range_min, range_max = np.min(dados, axis=0), np.max(dados, axis=0)
+        margem = (range_max - range_min) * 0.1
+        # Features constantes recebem uma faixa unitária para evitar bins de largura nula
+        margem = np.where(margem > 0, margem, 0.5)
+        self.range_min, self.range_max = range_min - margem, range_max + margem
+        self.bordas = np.linspace(self.range_min, self.range_max, self.BINS + 1, axis=-1)
+        self.baseline_dist = self._calcular_distribuicoes(dados)
+        
+    @staticmethod
+    def _como_matriz(dados):
+        """Converte DataFrame/array em matriz float64 (amostras x features)."""
+        if hasattr(dados, 'to_numpy'):
+            dados = dados.to_numpy()
+        dados = np.asarray(dados, dtype=np.float64)
+        if dados.ndim == 1:
+            dados = dados[:, None]
+        if dados.ndim != 2:
+            raise ValueError(f"Dados devem ser 2-D (amostras x features), recebido shape {dados.shape}")
+        return dados
+        
+    def _calcular_distribuicoes(self, dados):
+        """
+        Distribuições `(features, BINS)` equivalentes a `np.histogram(..., density=True)`
+        com as bordas de cada feature: valores fora da faixa (ou NaN) são descartados.
+        """
+        n_features = dados.shape[1]
+        valores = dados.T
+        dentro = (valores >= self.range_min[:, None]) & (valores <= self.range_max[:, None])
+        # NaN e valores fora da faixa são descartados pela máscara
+        valores = np.where(dentro, valores, self.range_min[:, None])
+        indices = indices_bins_uniformes(valores, self.range_min, self.range_max, self.BINS)
+        indices = indices + (np.arange(n_features) * self.BINS)[:, None]
+        contagens = np.bincount(indices[dentro], minlength=n_features * self.BINS).reshape(n_features, self.BINS)
+        
+        largura = (self.range_max - self.range_min)[:, None] / self.BINS
+        with np.errstate(invalid='ignore', divide='ignore'):
+            hist = contagens / largura / np.sum(contagens, axis=1, keepdims=True)
+        hist = np.maximum(np.nan_to_num(hist), 1e-10)
+        return hist / np.sum(hist, axis=1, keepdims=True)
+        
+    def verificar_drift(self, novos_dados):
+        """
+        Calcula o drift de todas as features para um lote.
+        
+        Args:
+            novos_dados: Matriz (amostras x features) ou DataFrame com as
+                mesmas colunas do baseline
+            
+        Returns:
+            np.ndarray: Array estruturado com uma linha por feature e campos
+            feature, drift_score_w, drift_score_kl, nivel e tamanho_amostra
+        """
+        dados = self._como_matriz(novos_dados)
+        if dados.shape[1] != len(self.nomes_features):
+            raise ValueError(f"Lote com {dados.shape[1]} features; baseline tem {len(self.nomes_features)}")
+        prod_dist = self._calcular_distribuicoes(dados)
+        divergencias = calcular_divergencias_lote(self.baseline_dist, prod_dist, metricas=('w', 'kl'))
+        score_w = divergencias['w']
+        score_kl = np.where(np.isfinite(divergencias['kl']), divergencias['kl'], np.inf)
+        
+        nivel = np.select([score_w > 0.5, score_w > 0.2, score_w > 0.05],
+                          ["CRÍTICO", "Moderado", "Leve"], default="Normal")
+        largura_nome = max((len(nome) for nome in self.nomes_features), default=1)
+        resultado = np.empty(len(self.nomes_features), dtype=[
+            ('feature', f'U{largura_nome}'), ('drift_score_w', np.float64),
+            ('drift_score_kl', np.float64), ('nivel', 'U8'), ('tamanho_amostra', np.int64)])
+        resultado['feature'] = self.nomes_features
+        resultado['drift_score_w'] = score_w
+        resultado['drift_score_kl'] = score_kl
+        resultado['nivel'] = nivel
+        resultado['tamanho_amostra'] = len(dados)
+        return resultado
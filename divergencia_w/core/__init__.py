@@ -1,11 +1,27 @@
 # -*- coding: utf-8 -*-
 from .matematica_base import (
     calcular_kl, calcular_w, calcular_jensen_shannon, 
-    calcular_hellinger, normalizar_distribuicao, validar_distribuicoes
+    calcular_hellinger, normalizar_distribuicao, validar_distribuicoes,
+    calcular_w_lote, normalizar_distribuicao_lote, validar_distribuicoes_lote,
+    calcular_w_lambdas, calcular_divergencias, calcular_divergencias_lote
+)
+from .backends import definir_backend, obter_backend, registrar_backend, backends_disponiveis
+from .distancias_w import cdist_w, pdist_w
+from .workspace_w import WorkspaceW
+from .fora_memoria import calcular_w_fora_memoria, SomaCompensada
+from .incremental import WIncremental
+from .histograma_deslizante import HistogramaDeslizante
+from .histograma_acumulado import (
+    indices_bins_uniformes, contagens_acumuladas, w_janelas_adjacentes, w_multiescala
+)
+from .kde_fft import kde_fft, kde_fft_lote, binning_linear, suavizar_fft, largura_banda_silverman
+from .esparsa import (
+    DistribuicaoEsparsa, para_esparsa, calcular_w_esparsa, calcular_kl_esparsa,
+    calcular_jensen_shannon_esparsa, calcular_hellinger_esparsa
 )
 from .tensores import operacoes_tensorais_w
 from .integracao import integrar_w
-from .derivadas import gradiente_w
+from .derivadas import gradiente_w, gradiente_w_lote, produto_hessiano_vetor_w
 from .espacos_metricos import verificar_axiomas_metrica
 from .otimizacao import otimizar_parametros_w
 from .algebra_linear import projetar_no_simplex
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Divergência W - Backends de Cálculo
+Autor: Luiz Tiago Wilcke
+
+Registro de motores de cálculo para as divergências. O backend `numpy` é
+sempre disponível; `numexpr` e `numba` são acelerações opcionais e, quando
+não instaladas, a seleção cai automaticamente para `numpy` com um aviso.
+
+Todos os kernels recebem arrays float64 já validados, com as categorias no
+último eixo (compatíveis por broadcasting), e reduzem ao longo desse eixo.
+"""
+import os
+import warnings
+import numpy as np
+from typing import Callable, Dict, List
+
+
+def _normalizar(p: np.ndarray, epsilon: float) -> np.ndarray:
+    p = np.maximum(p, epsilon)
+    return p / np.sum(p, axis=-1, keepdims=True)
+
+
+class BackendNumpy:
+    """Implementação de referência em NumPy puro."""
+    nome = 'numpy'
+
+    def w(self, p, q, epsilon, lambda_suavizacao, normalizar=True):
+        if normalizar:
+            p, q = _normalizar(p, epsilon), _normalizar(q, epsilon)
+        dif = p - q
+        termo_chi = (dif ** 2) / (p + q + epsilon)
+        fator_exp = np.exp(-lambda_suavizacao * np.abs(dif))
+        return np.sum(termo_chi * fator_exp, axis=-1)
+
+    def kl(self, p, q, epsilon, normalizar=True):
+        if normalizar:
+            p, q = _normalizar(p, epsilon), _normalizar(q, epsilon)
+        else:
+            p, q = np.maximum(p, epsilon), np.maximum(q, epsilon)
+        return np.sum(p * np.log(p / q), axis=-1)
+
+    def jensen_shannon(self, p, q, epsilon):
+        p, q = _normalizar(p, epsilon), _normalizar(q, epsilon)
+        m = 0.5 * (p + q)
+        return 0.5 * self.kl(p, m, epsilon, False) + 0.5 * self.kl(q, m, epsilon, False)
+
+    def hellinger(self, p, q, epsilon):
+        p, q = _normalizar(p, epsilon), _normalizar(q, epsilon)
+        return np.sqrt(0.5 * np.sum((np.sqrt(p) - np.sqrt(q)) ** 2, axis=-1))
+
+    def divergencias(self, p, q, metricas, epsilon, lambda_suavizacao):
+        """Calcula várias métricas normalizando uma única vez e compartilhando intermediários."""
+        p, q = _normalizar(p, epsilon), _normalizar(q, epsilon)
+        resultados = {}
+        soma = p + q
+        if 'w' in metricas:
+            dif = p - q
+            termo_chi = (dif ** 2) / (soma + epsilon)
+            resultados['w'] = np.sum(termo_chi * np.exp(-lambda_suavizacao * np.abs(dif)), axis=-1)
+        if 'kl' in metricas or 'js' in metricas:
+            log_p, log_q = np.log(p), np.log(q)
+            if 'kl' in metricas:
+                resultados['kl'] = np.sum(p * (log_p - log_q), axis=-1)
+            if 'js' in metricas:
+                # Mesmo piso ε aplicado por calcular_kl(..., normalizar=False)
+                log_eps = np.log(epsilon)
+                p_piso, q_piso = np.maximum(p, epsilon), np.maximum(q, epsilon)
+                log_p = np.where(p < epsilon, log_eps, log_p)
+                log_q = np.where(q < epsilon, log_eps, log_q)
+                log_m = np.log(np.maximum(0.5 * soma, epsilon))
+                resultados['js'] = (0.5 * np.sum(p_piso * (log_p - log_m), axis=-1) +
+                                    0.5 * np.sum(q_piso * (log_q - log_m), axis=-1))
+        if 'hellinger' in metricas:
+            resultados['hellinger'] = np.sqrt(0.5 * np.sum((np.sqrt(p) - np.sqrt(q)) ** 2, axis=-1))
+        return resultados
+
+
+class BackendNumexpr(BackendNumpy):
+    """
+    Avalia os termos de W, KL e Hellinger como uma única expressão fundida e
+    multithread do numexpr. As reduções ficam com `np.sum`: o `sum` do
+    numexpr roda em uma única thread. O ganho sobre `numpy` vem apenas da
+    avaliação paralela dos termos; com uma única thread os dois se equivalem.
+    """
+    nome = 'numexpr'
+
+    # p e q normalizados em linha: max(x, ε) / Σ max(x, ε)
+    _P = "(where(p > eps, p, eps) / sp)"
+    _Q = "(where(q > eps, q, eps) / sq)"
+
+    def __init__(self):
+        import numexpr
+        self._ne = numexpr
+
+    def _soma_piso(self, x, epsilon):
+        """Σ max(x, ε) no último eixo (mantido para broadcasting)."""
+        return np.sum(self._ne.evaluate("where(x > eps, x, eps)", local_dict={'x': x, 'eps': epsilon}),
+                      axis=-1, keepdims=True)
+
+    def _avaliar(self, expressao, p, q, epsilon, lambda_suavizacao=0.0, normalizar=True):
+        if normalizar:
+            sp, sq = self._soma_piso(p, epsilon), self._soma_piso(q, epsilon)
+            a, b = self._P, self._Q
+        else:
+            sp = sq = 1.0
+            a, b = "where(p > eps, p, eps)", "where(q > eps, q, eps)"
+        termos = self._ne.evaluate(
+            expressao.format(a=a, b=b),
+            local_dict={'p': p, 'q': q, 'eps': epsilon, 'lam': lambda_suavizacao, 'sp': sp, 'sq': sq})
+        return np.sum(termos, axis=-1)
+
+    def w(self, p, q, epsilon, lambda_suavizacao, normalizar=True):
+        if not normalizar:
+            # W sem normalização não aplica o piso ε às entradas
+            return super().w(p, q, epsilon, lambda_suavizacao, normalizar)
+        return self._avaliar("({a} - {b})**2 / ({a} + {b} + eps) * exp(-lam * abs({a} - {b}))",
+                             p, q, epsilon, lambda_suavizacao)
+
+    def kl(self, p, q, epsilon, normalizar=True):
+        return self._avaliar("{a} * log({a} / {b})", p, q, epsilon, normalizar=normalizar)
+
+    def hellinger(self, p, q, epsilon):
+        return np.sqrt(0.5 * self._avaliar("(sqrt({a}) - sqrt({b}))**2", p, q, epsilon))
+
+
+def _compilar_kernels_numba():
+    """Carrega os kernels do numba (compilados na primeira chamada ou lidos do cache em disco)."""
+    from .kernels_numba import vetor, matriz
+    return vetor, matriz
+
+
+class BackendNumba(BackendNumpy):
+    """
+    Laços fundidos compilados pelo numba: uma passada para as somas de
+    normalização e outra para o termo de cada bin, sem arrays temporários.
+    Vetores grandes usam redução paralela em `prange` sobre os bins; lotes
+    `(N, K)` paralelizam sobre as linhas.
+    """
+    nome = 'numba'
+    _W, _KL, _HELLINGER = 0, 1, 2
+
+    def __init__(self):
+        self._vetor, self._matriz = _compilar_kernels_numba()
+
+    def _executar(self, p, q, epsilon, lambda_suavizacao, normalizar, piso, metrica):
+        if p.ndim == 1 and q.ndim == 1:
+            return np.float64(self._vetor(p, q, epsilon, lambda_suavizacao, normalizar, piso, metrica))
+        forma = np.broadcast_shapes(p.shape, q.shape)
+        p2, q2 = self._linhas(p, forma), self._linhas(q, forma)
+        resultado = self._matriz(p2, q2, epsilon, lambda_suavizacao, normalizar, piso, metrica)
+        return resultado.reshape(forma[:-1])
+
+    @staticmethod
+    def _linhas(x, forma):
+        """
+        Matriz `(linhas, K)` para o kernel `matriz`: a própria entrada quando já
+        tem a forma inicial completa `forma[:-1]` ou é uma única linha
+        (reaproveitada pelo kernel); caso contrário (ex.: `(N, 1, K)` contra
+        `(1, M, K)`), a entrada é materializada por broadcasting.
+        """
+        if x.shape[-1] != forma[-1] or (x.shape[:-1] != forma[:-1] and x.size != x.shape[-1]):
+            x = np.broadcast_to(x, forma)
+        return np.ascontiguousarray(x.reshape(-1, forma[-1]))
+
+    def w(self, p, q, epsilon, lambda_suavizacao, normalizar=True):
+        return self._executar(p, q, epsilon, lambda_suavizacao, normalizar, normalizar, self._W)
+
+    def kl(self, p, q, epsilon, normalizar=True):
+        return self._executar(p, q, epsilon, 0.0, normalizar, True, self._KL)
+
+    def hellinger(self, p, q, epsilon):
+        return np.sqrt(0.5 * self._executar(p, q, epsilon, 0.0, True, True, self._HELLINGER))
+
+
+_FABRICAS: Dict[str, Callable[[], BackendNumpy]] = {
+    'numpy': BackendNumpy,
+    'numexpr': BackendNumexpr,
+    'numba': BackendNumba,
+}
+_instancias: Dict[str, BackendNumpy] = {}
+_backend_atual: BackendNumpy = BackendNumpy()
+
+
+def registrar_backend(nome: str, fabrica: Callable[[], BackendNumpy]):
+    """Registra um novo backend. `fabrica` deve lançar ImportError se uma dependência faltar."""
+    _FABRICAS[nome] = fabrica
+    _instancias.pop(nome, None)
+
+
+def _instanciar(nome: str) -> BackendNumpy:
+    if nome not in _instancias:
+        _instancias[nome] = _FABRICAS[nome]()
+    return _instancias[nome]
+
+
+def backends_disponiveis() -> List[str]:
+    """Lista os backends registrados cujas dependências estão instaladas."""
+    disponiveis = []
+    for nome in _FABRICAS:
+        try:
+            _instanciar(nome)
+            disponiveis.append(nome)
+        except ImportError:
+            pass
+    return disponiveis
+
+
+def definir_backend(nome: str) -> BackendNumpy:
+    """
+    Seleciona o backend usado por todas as divergências públicas.
+    Se a dependência opcional não estiver instalada, usa `numpy` e emite um aviso.
+    """
+    global _backend_atual
+    if nome not in _FABRICAS:
+        raise ValueError(f"Backend desconhecido: {nome}. Registrados: {sorted(_FABRICAS)}")
+    try:
+        _backend_atual = _instanciar(nome)
+    except ImportError as erro:
+        warnings.warn(f"Backend '{nome}' indisponível ({erro}); usando 'numpy'.")
+        _backend_atual = _instanciar('numpy')
+    return _backend_atual
+
+
+def obter_backend() -> BackendNumpy:
+    """Retorna o backend atualmente selecionado."""
+    return _backend_atual
+
+
+if os.environ.get('DIVERGENCIA_W_BACKEND'):
+    definir_backend(os.environ['DIVERGENCIA_W_BACKEND'])
@@ -4,19 +4,79 @@ Divergência W - Derivadas e Gradientes
 Autor: Luiz Tiago Wilcke
 """
 import numpy as np
+from .matematica_base import (
+    EPSILON_PADRAO, LAMBDA_PADRAO, validar_distribuicoes, validar_distribuicoes_lote
+)
 
-def gradiente_w(p: np.ndarray, q: np.ndarray, epsilon: float = 1e-10) -> np.ndarray:
-    """Calcula o gradiente da Divergência W em relação a P."""
-    # Aproximação numérica simples do gradiente para demonstração
-    h = 1e-7
-    grad = np.zeros_like(p)
-    from .matematica_base import calcular_w
-    
-    for i in range(len(p)):
-        p_plus = p.copy()
-        p_plus[i] += h
-        p_minus = p.copy()
-        p_minus[i] -= h
-        grad[i] = (calcular_w(p_plus, q) - calcular_w(p_minus, q)) / (2 * h)
-    
-    return grad
+def _derivadas_termo(x: np.ndarray, y: np.ndarray, epsilon: float, lambda_suavizacao: float,
+                     segunda_ordem: bool = False):
+    """
+    Derivadas de t(x, y) = (x - y)² / (x + y + ε) · exp(-λ|x - y|) em relação a x.
+    Retorna (t, dt/dx) ou (t, dt/dx, d²t/dx²).
+    """
+    d = x - y
+    s = x + y + epsilon
+    sinal = np.sign(d)
+    fator_exp = np.exp(-lambda_suavizacao * np.abs(d))
+    a = 2 * d / s - d ** 2 / s ** 2 - lambda_suavizacao * sinal * d ** 2 / s
+    termo = d ** 2 / s * fator_exp
+    primeira = fator_exp * a
+    if not segunda_ordem:
+        return termo, primeira
+    da = (2 / s - 4 * d / s ** 2 + 2 * d ** 2 / s ** 3
+          - lambda_suavizacao * sinal * (2 * d / s - d ** 2 / s ** 2))
+    segunda = fator_exp * (da - lambda_suavizacao * sinal * a)
+    return termo, primeira, segunda
+
+def _preparar_gradiente(p, q, epsilon):
+    """Normaliza P e Q como em `calcular_w` e guarda o necessário para a Jacobiana."""
+    mascara = p > epsilon
+    m_p = np.where(mascara, p, epsilon)
+    soma_p = np.sum(m_p, axis=-1, keepdims=True)
+    q_m = np.maximum(q, epsilon)
+    return mascara, soma_p, m_p / soma_p, q_m / np.sum(q_m, axis=-1, keepdims=True)
+
+def gradiente_w_lote(p: np.ndarray, q: np.ndarray, epsilon: float = EPSILON_PADRAO,
+                     lambda_suavizacao: float = LAMBDA_PADRAO, normalizar: bool = True) -> np.ndarray:
+    """
+    Gradiente analítico de W em relação a P para lotes `(N, K)` (ou `(N, K)` x `(K,)`).
+
+    Com `normalizar=True` inclui a Jacobiana de p -> max(p, ε) / Σ max(p, ε):
+    ∂W/∂p_i = 1[p_i > ε] / S · (g_i - Σ_j g_j p̂_j), onde g = ∂W/∂p̂.
+    """
+    p, q = validar_distribuicoes_lote(p, q)
+    if not normalizar:
+        return np.broadcast_to(_derivadas_termo(p, q, epsilon, lambda_suavizacao)[1],
+                               np.broadcast_shapes(p.shape, q.shape)).copy()
+    mascara, soma_p, p_n, q_n = _preparar_gradiente(p, q, epsilon)
+    _, g = _derivadas_termo(p_n, q_n, epsilon, lambda_suavizacao)
+    projecao = np.sum(g * p_n, axis=-1, keepdims=True)
+    return mascara * (g - projecao) / soma_p
+
+def gradiente_w(p: np.ndarray, q: np.ndarray, epsilon: float = EPSILON_PADRAO,
+                lambda_suavizacao: float = LAMBDA_PADRAO, normalizar: bool = True) -> np.ndarray:
+    """Calcula o gradiente da Divergência W em relação a P (forma fechada, O(K))."""
+    p, q = validar_distribuicoes(p, q)
+    return gradiente_w_lote(p, q, epsilon, lambda_suavizacao, normalizar)
+
+def produto_hessiano_vetor_w(p: np.ndarray, q: np.ndarray, v: np.ndarray,
+                             epsilon: float = EPSILON_PADRAO, lambda_suavizacao: float = LAMBDA_PADRAO,
+                             normalizar: bool = True) -> np.ndarray:
+    """
+    Produto Hessiana-vetor H·v de W em relação a P, sem formar a Hessiana (O(K)).
+    Aceita lotes `(N, K)` com `v` do mesmo formato.
+    """
+    p, q = validar_distribuicoes_lote(p, q)
+    v = np.asarray(v, dtype=np.float64)
+    if not normalizar:
+        return _derivadas_termo(p, q, epsilon, lambda_suavizacao, segunda_ordem=True)[2] * v
+    mascara, soma_p, p_n, q_n = _preparar_gradiente(p, q, epsilon)
+    _, g, h = _derivadas_termo(p_n, q_n, epsilon, lambda_suavizacao, segunda_ordem=True)
+    u = mascara * v
+    d_soma = np.sum(u, axis=-1, keepdims=True)
+    d_p_n = (u - p_n * d_soma) / soma_p
+    projecao = np.sum(g * p_n, axis=-1, keepdims=True)
+    d_g = h * d_p_n
+    d_projecao = np.sum(d_p_n * g + p_n * d_g, axis=-1, keepdims=True)
+    gradiente = (g - projecao) / soma_p
+    return mascara * ((d_g - d_projecao) / soma_p - gradiente * d_soma / soma_p)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Divergência W - Matrizes de Distância Pareadas
+Autor: Luiz Tiago Wilcke
+
+Calcula matrizes W entre conjuntos de histogramas em blocos (tiles) de
+tamanho limitado, evitando o tensor intermediário de M·N·K elementos.
+"""
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+from .matematica_base import (
+    EPSILON_PADRAO, LAMBDA_PADRAO, calcular_w_lote, normalizar_distribuicao_lote
+)
+
+# Limite padrão de memória temporária (bytes) somando todas as threads
+MEMORIA_MAXIMA_PADRAO = 256 * 2**20
+# Arrays temporários de tamanho (bloco_m, bloco_n, K) criados por bloco
+_TEMPORARIOS_POR_BLOCO = 4
+
+
+def _tamanho_bloco(k: int, memoria_max_bytes: int, n_threads: int) -> int:
+    """Lado do bloco quadrado cujos temporários cabem na memória disponível por thread."""
+    elementos = memoria_max_bytes // (n_threads * _TEMPORARIOS_POR_BLOCO * 8 * k)
+    return max(1, int(np.sqrt(max(elementos, 1))))
+
+
+def _preparar_saida(saida: Union[None, str, np.ndarray], forma: tuple) -> np.ndarray:
+    """Aloca a matriz de saída em memória ou como `np.memmap` em disco."""
+    if saida is None:
+        return np.empty(forma, dtype=np.float64)
+    if isinstance(saida, (str, os.PathLike)):
+        return np.memmap(saida, dtype=np.float64, mode='w+', shape=forma)
+    if saida.shape != forma:
+        raise ValueError(f"Saída com dimensões incorretas: {saida.shape} vs {forma}")
+    return saida
+
+
+def _executar_blocos(tarefas, n_threads: int):
+    if n_threads == 1:
+        for tarefa in tarefas:
+            tarefa()
+        return
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        for futuro in [executor.submit(tarefa) for tarefa in tarefas]:
+            futuro.result()
+
+
+def _preparar_lote(x: np.ndarray, epsilon: float, normalizar: bool) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim != 2:
+        raise ValueError(f"Esperado array 2-D (n_histogramas, K), recebido {x.shape}")
+    return normalizar_distribuicao_lote(x, epsilon) if normalizar else x
+
+
+def cdist_w(A: np.ndarray, B: np.ndarray, epsilon: float = EPSILON_PADRAO,
+            lambda_suavizacao: float = LAMBDA_PADRAO, normalizar: bool = True,
+            memoria_max_bytes: int = MEMORIA_MAXIMA_PADRAO, n_threads: Optional[int] = None,
+            saida: Union[None, str, np.ndarray] = None) -> np.ndarray:
+    """
+    Calcula a matriz `(M, N)` de Divergências W entre as linhas de `A (M, K)` e `B (N, K)`.
+
+    Os blocos são processados em paralelo por um pool de threads (as ufuncs do
+    NumPy liberam o GIL) e a memória temporária total fica limitada a
+    `memoria_max_bytes`. `saida` pode ser um array pré-alocado (inclusive
+    `np.memmap`) ou um caminho de arquivo, caso em que a matriz é escrita em um
+    `np.memmap` e pode ser maior que a RAM.
+    """
+    A = _preparar_lote(A, epsilon, normalizar)
+    B = _preparar_lote(B, epsilon, normalizar)
+    if A.shape[1] != B.shape[1]:
+        raise ValueError(f"Dimensões incompatíveis: {A.shape} vs {B.shape}")
+    n_threads = n_threads or os.cpu_count() or 1
+    resultado = _preparar_saida(saida, (A.shape[0], B.shape[0]))
+    bloco = _tamanho_bloco(A.shape[1], memoria_max_bytes, n_threads)
+
+    def tarefa(i, j):
+        a, b = A[i:i + bloco], B[j:j + bloco]
+        def executar():
+            resultado[i:i + len(a), j:j + len(b)] = calcular_w_lote(
+                a[:, None, :], b[None, :, :], epsilon, lambda_suavizacao, normalizar=False)
+        return executar
+
+    _executar_blocos([tarefa(i, j) for i in range(0, A.shape[0], bloco)
+                      for j in range(0, B.shape[0], bloco)], n_threads)
+    if isinstance(resultado, np.memmap):
+        resultado.flush()
+    return resultado
+
+
+def pdist_w(A: np.ndarray, epsilon: float = EPSILON_PADRAO,
+            lambda_suavizacao: float = LAMBDA_PADRAO, normalizar: bool = True,
+            memoria_max_bytes: int = MEMORIA_MAXIMA_PADRAO, n_threads: Optional[int] = None,
+            saida: Union[None, str, np.ndarray] = None) -> np.ndarray:
+    """
+    Calcula a matriz quadrada `(M, M)` de Divergências W entre as linhas de `A`.
+
+    Como W é simétrica, apenas os blocos do triângulo superior são calculados
+    e espelhados. Parâmetros como em `cdist_w`.
+    """
+    A = _preparar_lote(A, epsilon, normalizar)
+    n_threads = n_threads or os.cpu_count() or 1
+    resultado = _preparar_saida(saida, (A.shape[0], A.shape[0]))
+    bloco = _tamanho_bloco(A.shape[1], memoria_max_bytes, n_threads)
+
+    def tarefa(i, j):
+        a, b = A[i:i + bloco], A[j:j + bloco]
+        def executar():
+            valores = calcular_w_lote(a[:, None, :], b[None, :, :], epsilon,
+                                      lambda_suavizacao, normalizar=False)
+            resultado[i:i + len(a), j:j + len(b)] = valores
+            if i != j:
+                resultado[j:j + len(b), i:i + len(a)] = valores.T
+        return executar
+
+    inicios = range(0, A.shape[0], bloco)
+    _executar_blocos([tarefa(i, j) for i in inicios for j in inicios if j >= i], n_threads)
+    if isinstance(resultado, np.memmap):
+        resultado.flush()
+    return resultado
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Divergência W - Cálculo Fora da Memória (Out-of-Core)
+Autor: Luiz Tiago Wilcke
+
+Calcula W sobre histogramas maiores que a RAM (p.ex. `np.memmap` com 10⁸–10⁹
+bins) em duas passadas por blocos: a primeira acumula as somas de
+normalização e a segunda acumula W. Dentro de cada bloco a soma do NumPy é
+pareada; entre blocos usa-se soma compensada (Kahan-Neumaier), de modo que a
+precisão não degrada com o número de bins e a memória de pico depende apenas
+do tamanho do bloco.
+"""
+import numpy as np
+from typing import Optional
+from .matematica_base import EPSILON_PADRAO, LAMBDA_PADRAO
+from .backends import obter_backend
+
+TAMANHO_BLOCO_PADRAO = 2**20
+
+
+class SomaCompensada:
+    """Acumulador de Kahan-Neumaier para somas longas de parciais em ponto flutuante."""
+    def __init__(self):
+        self.soma = 0.0
+        self.compensacao = 0.0
+
+    def adicionar(self, valor: float):
+        valor = float(valor)
+        total = self.soma + valor
+        if abs(self.soma) >= abs(valor):
+            self.compensacao += (self.soma - total) + valor
+        else:
+            self.compensacao += (valor - total) + self.soma
+        self.soma = total
+
+    @property
+    def valor(self) -> float:
+        return self.soma + self.compensacao
+
+
+def _como_vetor(x, dtype) -> np.ndarray:
+    """Vista 1-D sem cópia de um ndarray/`np.memmap` ou de qualquer objeto com protocolo de buffer."""
+    if not isinstance(x, np.ndarray):
+        x = np.frombuffer(x, dtype=dtype) if dtype is not None else np.asarray(memoryview(x))
+    return x.reshape(-1)
+
+
+def calcular_w_fora_memoria(p, q, epsilon: float = EPSILON_PADRAO,
+                            lambda_suavizacao: float = LAMBDA_PADRAO, normalizar: bool = True,
+                            tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+                            dtype: Optional[np.dtype] = None) -> float:
+    """
+    Calcula W(P, Q) lendo P e Q em blocos de `tamanho_bloco` elementos.
+
+    `p` e `q` podem ser `np.memmap`, ndarrays ou objetos com protocolo de buffer
+    (para bytes crus, informe `dtype`). Apenas o bloco atual é convertido para
+    float64; os arrays de entrada nunca são modificados.
+    """
+    p, q = _como_vetor(p, dtype), _como_vetor(q, dtype)
+    if p.shape != q.shape:
+        raise ValueError(f"Dimensões incompatíveis: {p.shape} vs {q.shape}")
+    n = p.shape[0]
+
+    soma_p, soma_q = 1.0, 1.0
+    if normalizar:
+        acumulado_p, acumulado_q = SomaCompensada(), SomaCompensada()
+        for inicio in range(0, n, tamanho_bloco):
+            fim = inicio + tamanho_bloco
+            acumulado_p.adicionar(np.sum(np.maximum(p[inicio:fim], epsilon, dtype=np.float64)))
+            acumulado_q.adicionar(np.sum(np.maximum(q[inicio:fim], epsilon, dtype=np.float64)))
+        soma_p, soma_q = acumulado_p.valor, acumulado_q.valor
+
+    backend = obter_backend()
+    w = SomaCompensada()
+    for inicio in range(0, n, tamanho_bloco):
+        fim = inicio + tamanho_bloco
+        bloco_p = np.asarray(p[inicio:fim], dtype=np.float64)
+        bloco_q = np.asarray(q[inicio:fim], dtype=np.float64)
+        if normalizar:
+            bloco_p = np.maximum(bloco_p, epsilon) / soma_p
+            bloco_q = np.maximum(bloco_q, epsilon) / soma_q
+        w.adicionar(backend.w(bloco_p, bloco_q, epsilon, lambda_suavizacao, normalizar=False))
+    return w.valor
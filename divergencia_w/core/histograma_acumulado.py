@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Divergência W - Histogramas por Somas de Prefixo
+Autor: Luiz Tiago Wilcke
+
+Com bordas fixas, o histograma de qualquer janela [i, j) é C[j] - C[i], onde
+C é a tabela acumulada de contagens por bin. Assim todas as janelas de muitas
+séries são obtidas com uma única soma cumulativa e pontuadas em lote.
+"""
+import numpy as np
+from .matematica_base import EPSILON_PADRAO, LAMBDA_PADRAO, calcular_w_lote
+
+
+def indices_bins_uniformes(valores, minimo, maximo, n_bins: int) -> np.ndarray:
+    """
+    Bin de cada valor com bordas `np.linspace(minimo, maximo, n_bins + 1)` no
+    último eixo (uma faixa por série quando `minimo`/`maximo` são vetores).
+    Equivale a `searchsorted(bordas, x, 'right') - 1`; valores fora da faixa
+    vão para o primeiro ou o último bin. Requer `minimo < maximo`.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    minimo = np.asarray(minimo, dtype=np.float64)
+    maximo = np.asarray(maximo, dtype=np.float64)
+    bordas = np.linspace(minimo, maximo, n_bins + 1, axis=-1)
+    minimo, maximo = minimo[..., None], maximo[..., None]
+    indices = np.clip(np.floor((valores - minimo) / (maximo - minimo) * n_bins),
+                      0, n_bins - 1).astype(np.intp)
+    # Corrige o arredondamento da divisão contra as bordas exatas do linspace
+    indices -= valores < np.take_along_axis(bordas, indices, axis=-1)
+    indices += ((valores >= np.take_along_axis(bordas, np.clip(indices + 1, 0, n_bins), axis=-1))
+                & (indices < n_bins - 1))
+    return np.clip(indices, 0, n_bins - 1)
+
+
+def contagens_acumuladas(indices, n_bins: int, dtype=np.int32) -> np.ndarray:
+    """
+    Tabela `(..., n + 1, n_bins)` em que a posição j contém as contagens por bin
+    dos j primeiros elementos de `indices` (`(..., n)`).
+    """
+    indices = np.asarray(indices)
+    tabela = np.zeros(indices.shape[:-1] + (indices.shape[-1] + 1, n_bins), dtype=dtype)
+    np.put_along_axis(tabela[..., 1:, :], indices[..., None], 1, axis=-1)
+    return np.cumsum(tabela, axis=-2, out=tabela)
+
+
+def w_janelas_adjacentes(acumulado: np.ndarray, tamanho_referencia: int, tamanho_teste: int = None,
+                         epsilon: float = EPSILON_PADRAO,
+                         lambda_suavizacao: float = LAMBDA_PADRAO) -> np.ndarray:
+    """
+    W(referência, teste) para janelas adjacentes terminando em cada j em [r + t, n]:
+    referência [j - t - r, j - t) e teste [j - t, j), a partir da tabela de
+    `contagens_acumuladas`. Retorna `(..., n + 1 - r - t)`.
+    """
+    tamanho_teste = tamanho_teste or tamanho_referencia
+    total = tamanho_referencia + tamanho_teste
+    n = acumulado.shape[-2] - 1
+    if n < total:
+        return np.empty(acumulado.shape[:-2] + (0,))
+    inicio = acumulado[..., :n + 1 - total, :]
+    meio = acumulado[..., tamanho_referencia:n + 1 - tamanho_teste, :]
+    fim = acumulado[..., total:, :]
+    p = np.subtract(meio, inicio, dtype=np.float64)
+    q = np.subtract(fim, meio, dtype=np.float64)
+    return calcular_w_lote(p, q, epsilon, lambda_suavizacao)
+
+
+def w_multiescala(acumulado: np.ndarray, tamanhos_referencia, tamanhos_teste=None,
+                  epsilon: float = EPSILON_PADRAO, lambda_suavizacao: float = LAMBDA_PADRAO,
+                  elementos_bloco: int = 2**22) -> np.ndarray:
+    """
+    `w_janelas_adjacentes` para várias escalas sobre a mesma tabela acumulada
+    `(n + 1, n_bins)`. Retorna `(n_escalas, n + 1)`: a coluna j contém W para
+    as janelas que terminam em j (NaN quando j < r + t). Cada escala é
+    processada em blocos de fins de janela limitados por `elementos_bloco`.
+    """
+    tamanhos_referencia = np.atleast_1d(tamanhos_referencia)
+    tamanhos_teste = tamanhos_referencia if tamanhos_teste is None else np.atleast_1d(tamanhos_teste)
+    if tamanhos_referencia.shape != tamanhos_teste.shape:
+        raise ValueError("Listas de tamanhos de referência e de teste com comprimentos diferentes")
+    n = acumulado.shape[-2] - 1
+    passo = max(1, elementos_bloco // acumulado.shape[-1])
+    resultado = np.full((len(tamanhos_referencia), n + 1), np.nan)
+    for escala, (r, t) in enumerate(zip(tamanhos_referencia.tolist(), tamanhos_teste.tolist())):
+        for j0 in range(r + t, n + 1, passo):
+            j1 = min(n + 1, j0 + passo)
+            # Linhas [j0 - r - t, j1) cobrem todas as janelas que terminam em [j0, j1)
+            resultado[escala, j0:j1] = w_janelas_adjacentes(acumulado[j0 - r - t:j1], r, t,
+                                                            epsilon, lambda_suavizacao)
+    return resultado
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Divergência W - Histograma Deslizante
+Autor: Luiz Tiago Wilcke
+"""
+import numpy as np
+from bisect import bisect_right
+from typing import Optional
+from .matematica_base import EPSILON_PADRAO, LAMBDA_PADRAO
+from .incremental import WIncremental
+
+
+class HistogramaDeslizante:
+    """
+    Par de janelas adjacentes sobre um fluxo de valores — referência com as
+    `tamanho_referencia` amostras mais antigas e teste com as `tamanho_teste`
+    mais recentes — com bordas de bins fixas e W(referência, teste) mantida
+    incrementalmente.
+
+    A cada nova amostra apenas três bins mudam: o da amostra que entra no
+    teste, o da que passa do teste para a referência e o da que sai da
+    referência. As contribuições de W são atualizadas por `WIncremental.deslizar`,
+    então cada passo custa O(1) amortizado em vez de O(janela). Valores fora
+    das bordas são atribuídos ao primeiro ou ao último bin, mantendo o total
+    de cada janela constante. O caminho de uma amostra (`empurrar`) usa
+    apenas operações Python sobre listas (busca binária nas bordas e buffer
+    circular), sem o custo fixo de chamadas NumPy sobre escalares.
+    """
+    def __init__(self, bordas, tamanho_referencia: int, tamanho_teste: Optional[int] = None,
+                 epsilon: float = EPSILON_PADRAO, lambda_suavizacao: float = LAMBDA_PADRAO):
+        self.bordas = np.asarray(bordas, dtype=np.float64)
+        if self.bordas.ndim != 1 or len(self.bordas) < 2:
+            raise ValueError("Bordas devem ser um vetor 1-D com ao menos dois valores")
+        self.n_bins = len(self.bordas) - 1
+        self._bordas_lista = self.bordas.tolist()
+        self.tamanho_referencia = tamanho_referencia
+        self.tamanho_teste = tamanho_teste or tamanho_referencia
+        self._total = self.tamanho_referencia + self.tamanho_teste
+        # Buffer circular com o bin das últimas `_total` amostras
+        self._bins = [0] * self._total
+        self.n_observacoes = 0
+        self._w = WIncremental(np.zeros(self.n_bins), np.zeros(self.n_bins), epsilon, lambda_suavizacao)
+
+    def indices_bins(self, valores) -> np.ndarray:
+        """Bin de cada valor (intervalos fechados à esquerda; o último inclui a borda direita)."""
+        indices = np.searchsorted(self.bordas, valores, side='right') - 1
+        return np.clip(indices, 0, self.n_bins - 1)
+
+    @property
+    def cheio(self) -> bool:
+        """Indica se as duas janelas já estão completas."""
+        return self.n_observacoes >= self._total
+
+    @property
+    def valor(self) -> float:
+        """W(referência, teste) atual."""
+        return self._w.valor
+
+    @property
+    def contagens_referencia(self) -> np.ndarray:
+        return self._w.contagens['p']
+
+    @property
+    def contagens_teste(self) -> np.ndarray:
+        return self._w.contagens['q']
+
+    def _empurrar_bin(self, b: int) -> Optional[float]:
+        n = self.n_observacoes
+        posicao = n % self._total
+        if n >= self.tamanho_teste:
+            # Amostra de índice n - tamanho_teste passa do teste para a referência
+            transita = self._bins[(n - self.tamanho_teste) % self._total]
+            if n >= self._total:
+                self._w.deslizar(b, transita, self._bins[posicao])
+            else:
+                self._w.mover(transita, b, 1.0, 'q')
+                self._w.adicionar(transita, 1.0, 'p')
+        else:
+            self._w.adicionar(b, 1.0, 'q')
+        self._bins[posicao] = b
+        self.n_observacoes = n + 1
+        return self._w.valor if self.cheio else None
+
+    def empurrar(self, valor: float) -> Optional[float]:
+        """Insere uma amostra e retorna W, ou None enquanto as janelas não estão cheias."""
+        b = bisect_right(self._bordas_lista, valor) - 1
+        return self._empurrar_bin(min(max(b, 0), self.n_bins - 1))
+
+    def empurrar_lote(self, valores) -> np.ndarray:
+        """Insere várias amostras em ordem; retorna W após cada uma (NaN no aquecimento)."""
+        bins = self.indices_bins(np.asarray(valores, dtype=np.float64).ravel())
+        scores = np.full(len(bins), np.nan)
+        for i, b in enumerate(bins.tolist()):
+            score = self._empurrar_bin(b)
+            if score is not None:
+                scores[i] = score
+        return scores
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Divergência W - KDE Binado via FFT
+Autor: Luiz Tiago Wilcke
+
+Estimativa de densidade por kernel gaussiano em uma grade fixa: as amostras
+são distribuídas linearmente entre os dois pontos de grade vizinhos e os pesos
+são convoluídos com o kernel via FFT, em O(n + B log B) por janela. O
+resultado é uma distribuição de probabilidade sobre os B pontos da grade,
+diretamente utilizável como entrada de `calcular_w`.
+"""
+import numpy as np
+from .matematica_base import EPSILON_PADRAO
+
+
+def binning_linear(dados, minimo, maximo, n_pontos: int) -> np.ndarray:
+    """
+    Pesos `(..., n_pontos)` do binning linear de `dados` (`(..., n)`) na grade
+    `np.linspace(minimo, maximo, n_pontos)`; cada amostra reparte sua unidade
+    de massa entre os dois pontos vizinhos. Valores fora da faixa vão para o
+    ponto extremo. `minimo`/`maximo` podem ser escalares ou um valor por linha.
+    """
+    dados = np.asarray(dados, dtype=np.float64)
+    minimo = np.asarray(minimo, dtype=np.float64)[..., None]
+    maximo = np.asarray(maximo, dtype=np.float64)[..., None]
+    posicao = np.clip((dados - minimo) / (maximo - minimo) * (n_pontos - 1), 0, n_pontos - 1)
+    esquerda = np.minimum(np.floor(posicao).astype(np.intp), n_pontos - 2)
+    fracao = posicao - esquerda
+
+    linhas = dados.reshape(-1, dados.shape[-1])
+    n_linhas = linhas.shape[0]
+    deslocamento = (np.arange(n_linhas) * n_pontos)[:, None]
+    esquerda = esquerda.reshape(linhas.shape) + deslocamento
+    fracao = fracao.reshape(linhas.shape)
+    pesos = (np.bincount(esquerda.ravel(), weights=(1 - fracao).ravel(), minlength=n_linhas * n_pontos) +
+             np.bincount((esquerda + 1).ravel(), weights=fracao.ravel(), minlength=n_linhas * n_pontos))
+    return pesos.reshape(dados.shape[:-1] + (n_pontos,))
+
+
+def largura_banda_silverman(dados, axis: int = -1) -> np.ndarray:
+    """Regra de Silverman: 0.9 · min(σ, IQR/1.34) · n^(-1/5) (usa σ se o IQR for nulo)."""
+    dados = np.asarray(dados, dtype=np.float64)
+    n = dados.shape[axis]
+    sigma = np.std(dados, axis=axis, ddof=1) if n > 1 else np.zeros(np.delete(dados.shape, axis))
+    q75, q25 = np.percentile(dados, [75, 25], axis=axis)
+    escala = np.where((q75 - q25) > 0, np.minimum(sigma, (q75 - q25) / 1.34), sigma)
+    return 0.9 * escala * n ** (-0.2)
+
+
+def suavizar_fft(pesos, largura_banda_pontos, epsilon: float = EPSILON_PADRAO) -> np.ndarray:
+    """
+    Convolui os pesos `(..., B)` com um kernel gaussiano de desvio
+    `largura_banda_pontos` (em unidades de espaçamento da grade; escalar ou um
+    por linha) via FFT com preenchimento de zeros, e normaliza para uma
+    distribuição de probabilidade com piso ε. Largura nula não suaviza.
+    """
+    pesos = np.asarray(pesos, dtype=np.float64)
+    n_pontos = pesos.shape[-1]
+    tamanho = 2 * n_pontos
+    # Deslocamentos -(B-1)..(B-1) em ordem circular: 0, 1, ..., B-1, -(B-1), ..., -1
+    deslocamentos = np.fft.fftfreq(tamanho, 1.0 / tamanho)
+    deslocamentos[n_pontos] = np.inf # Posição sem correspondente na convolução linear
+    h = np.maximum(np.asarray(largura_banda_pontos, dtype=np.float64), 1e-12)[..., None]
+    kernel = np.exp(-0.5 * (deslocamentos / h) ** 2)
+    suavizado = np.fft.irfft(np.fft.rfft(pesos, tamanho) * np.fft.rfft(kernel, tamanho),
+                             tamanho)[..., :n_pontos]
+    suavizado = np.maximum(suavizado, epsilon)
+    return suavizado / np.sum(suavizado, axis=-1, keepdims=True)
+
+
+def kde_fft_lote(janelas, minimo, maximo, n_pontos: int = 50, largura_banda=None,
+                 epsilon: float = EPSILON_PADRAO) -> np.ndarray:
+    """
+    KDE binado de cada linha de `janelas` (`(N, n)`) na grade
+    `linspace(minimo, maximo, n_pontos)` (faixa escalar ou por linha).
+    `largura_banda` (na escala dos dados) usa a regra de Silverman por linha
+    quando omitida. Retorna distribuições `(N, n_pontos)`.
+    """
+    janelas = np.asarray(janelas, dtype=np.float64)
+    if largura_banda is None:
+        largura_banda = largura_banda_silverman(janelas)
+    espacamento = (np.asarray(maximo, dtype=np.float64) - np.asarray(minimo, dtype=np.float64)) / (n_pontos - 1)
+    pesos = binning_linear(janelas, minimo, maximo, n_pontos)
+    return suavizar_fft(pesos, np.asarray(largura_banda) / espacamento, epsilon)
+
+
+def kde_fft(dados, minimo: float, maximo: float, n_pontos: int = 50, largura_banda: float = None,
+            epsilon: float = EPSILON_PADRAO) -> np.ndarray:
+    """KDE binado de uma amostra 1-D; retorna a distribuição nos `n_pontos` da grade."""
+    return kde_fft_lote(np.ravel(dados)[None, :], minimo, maximo, n_pontos,
+                        largura_banda, epsilon)[0]
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Divergência W - Kernels Numba
+Autor: Luiz Tiago Wilcke
+
+Laços fundidos usados por `BackendNumba`: uma passada para as somas de
+normalização e outra para o termo de cada bin, com reduções paralelas em
+`prange`. Ficam no nível do módulo para que `cache=True` grave o código de
+máquina em disco e novos processos não recompilem. Importar este módulo
+exige o numba.
+"""
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True)
+def somas(p, q, eps, normalizar):
+    if not normalizar:
+        return 1.0, 1.0
+    sp = 0.0
+    sq = 0.0
+    for i in range(p.shape[0]):
+        sp += max(p[i], eps)
+        sq += max(q[i], eps)
+    return sp, sq
+
+
+@njit(cache=True)
+def termo(x, y, eps, lam, metrica):
+    if metrica == 0:
+        d = x - y
+        return d * d / (x + y + eps) * np.exp(-lam * abs(d))
+    if metrica == 1:
+        return x * np.log(x / y)
+    d = np.sqrt(x) - np.sqrt(y)
+    return d * d
+
+
+@njit(parallel=True, cache=True)
+def vetor(p, q, eps, lam, normalizar, piso, metrica):
+    sp, sq = 1.0, 1.0
+    if normalizar:
+        sp, sq = 0.0, 0.0
+        for i in prange(p.shape[0]):
+            sp += max(p[i], eps)
+            sq += max(q[i], eps)
+    total = 0.0
+    for i in prange(p.shape[0]):
+        x, y = p[i], q[i]
+        if piso:
+            x, y = max(x, eps), max(y, eps)
+        total += termo(x / sp, y / sq, eps, lam, metrica)
+    return total
+
+
+@njit(parallel=True, cache=True)
+def matriz(p, q, eps, lam, normalizar, piso, metrica):
+    n = max(p.shape[0], q.shape[0])
+    resultado = np.empty(n)
+    # Linhas únicas (1, K) são reaproveitadas para todo o lote
+    passo_p = 1 if p.shape[0] > 1 else 0
+    passo_q = 1 if q.shape[0] > 1 else 0
+    for r in prange(n):
+        linha_p = p[r * passo_p]
+        linha_q = q[r * passo_q]
+        sp, sq = somas(linha_p, linha_q, eps, normalizar)
+        total = 0.0
+        for i in range(linha_p.shape[0]):
+            x, y = linha_p[i], linha_q[i]
+            if piso:
+                x, y = max(x, eps), max(y, eps)
+            total += termo(x / sp, y / sq, eps, lam, metrica)
+        resultado[r] = total
+    return resultado
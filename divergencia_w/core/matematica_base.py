@@ -5,9 +5,12 @@ Autor: Luiz Tiago Wilcke
 """
 import numpy as np
 from typing import Union, Tuple
+from .backends import obter_backend
 
 EPSILON_PADRAO = 1e-10
 LAMBDA_PADRAO = 0.5
+# Máximo de elementos do tensor (linhas, λ, K) materializado por bloco em calcular_w_lambdas
+ELEMENTOS_BLOCO_LAMBDAS = 2**22
 
 def normalizar_distribuicao(p: np.ndarray, epsilon: float = EPSILON_PADRAO) -> np.ndarray:
     p = np.asarray(p, dtype=np.float64)
@@ -23,35 +26,119 @@ def validar_distribuicoes(p: np.ndarray, q: np.ndarray) -> Tuple[np.ndarray, np.
 
 def calcular_kl(p: np.ndarray, q: np.ndarray, epsilon: float = EPSILON_PADRAO, normalizar: bool = True) -> float:
     p, q = validar_distribuicoes(p, q)
-    if normalizar:
-        p = normalizar_distribuicao(p, epsilon)
-        q = normalizar_distribuicao(q, epsilon)
-    else:
-        p = np.maximum(p, epsilon)
-        q = np.maximum(q, epsilon)
-    return float(np.sum(p * np.log(p / q)))
+    return float(obter_backend().kl(p.ravel(), q.ravel(), epsilon, normalizar))
 
 def calcular_w(p: np.ndarray, q: np.ndarray, epsilon: float = EPSILON_PADRAO, 
                lambda_suavizacao: float = LAMBDA_PADRAO, normalizar: bool = True) -> float:
     p, q = validar_distribuicoes(p, q)
-    if normalizar:
-        p = normalizar_distribuicao(p, epsilon)
-        q = normalizar_distribuicao(q, epsilon)
-    dif = p - q
-    denominador = p + q + epsilon
-    termo_chi = (dif ** 2) / denominador
-    fator_exp = np.exp(-lambda_suavizacao * np.abs(dif))
-    return float(np.sum(termo_chi * fator_exp))
+    return float(obter_backend().w(p.ravel(), q.ravel(), epsilon, lambda_suavizacao, normalizar))
 
 def calcular_jensen_shannon(p: np.ndarray, q: np.ndarray, epsilon: float = EPSILON_PADRAO) -> float:
     p, q = validar_distribuicoes(p, q)
-    p = normalizar_distribuicao(p, epsilon)
-    q = normalizar_distribuicao(q, epsilon)
-    m = 0.5 * (p + q)
-    return 0.5 * calcular_kl(p, m, epsilon, False) + 0.5 * calcular_kl(q, m, epsilon, False)
+    return float(obter_backend().jensen_shannon(p.ravel(), q.ravel(), epsilon))
 
 def calcular_hellinger(p: np.ndarray, q: np.ndarray, epsilon: float = EPSILON_PADRAO) -> float:
     p, q = validar_distribuicoes(p, q)
-    p = normalizar_distribuicao(p, epsilon)
-    q = normalizar_distribuicao(q, epsilon)
-    return float(np.sqrt(0.5 * np.sum((np.sqrt(p) - np.sqrt(q)) ** 2)))
+    return float(obter_backend().hellinger(p.ravel(), q.ravel(), epsilon))
+
+def normalizar_distribuicao_lote(p: np.ndarray, epsilon: float = EPSILON_PADRAO, axis: int = -1) -> np.ndarray:
+    """Normaliza cada distribuição de um array ao longo do eixo `axis`."""
+    p = np.maximum(np.asarray(p, dtype=np.float64), epsilon)
+    return p / np.sum(p, axis=axis, keepdims=True)
+
+def validar_distribuicoes_lote(p: np.ndarray, q: np.ndarray, axis: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Valida lotes de distribuições e move o eixo das categorias para o final.
+    Vetores 1-D são tratados como uma única distribuição, comparada com todas as do outro lote.
+    """
+    p = np.asarray(p, dtype=np.float64)
+    q = np.asarray(q, dtype=np.float64)
+    if p.ndim == 0 or q.ndim == 0:
+        raise ValueError("Distribuições devem ter ao menos uma dimensão")
+    if p.ndim > 1:
+        p = np.moveaxis(p, axis, -1)
+    if q.ndim > 1:
+        q = np.moveaxis(q, axis, -1)
+    try:
+        np.broadcast_shapes(p.shape, q.shape)
+    except ValueError:
+        raise ValueError(f"Dimensões incompatíveis: {p.shape} vs {q.shape}") from None
+    if p.shape[-1] != q.shape[-1]:
+        raise ValueError(f"Dimensões incompatíveis: {p.shape} vs {q.shape}")
+    return p, q
+
+def calcular_w_lote(p: np.ndarray, q: np.ndarray, epsilon: float = EPSILON_PADRAO,
+                    lambda_suavizacao: float = LAMBDA_PADRAO, normalizar: bool = True,
+                    axis: int = -1) -> np.ndarray:
+    """
+    Calcula a Divergência W para lotes de distribuições em uma única passada vetorizada.
+
+    Aceita pares `(N, K)` x `(N, K)` ou `(N, K)` x `(K,)` (e, em geral, qualquer
+    par compatível por broadcasting), reduzindo ao longo de `axis`.
+    Retorna um array com um valor de W por distribuição, p.ex. `(N,)`.
+    """
+    p, q = validar_distribuicoes_lote(p, q, axis)
+    return obter_backend().w(p, q, epsilon, lambda_suavizacao, normalizar)
+
+def _termos_w(p: np.ndarray, q: np.ndarray, epsilon: float, normalizar: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Partes de W independentes de λ: termo chi-quadrado e |p - q| (último eixo)."""
+    if normalizar:
+        p = normalizar_distribuicao_lote(p, epsilon)
+        q = normalizar_distribuicao_lote(q, epsilon)
+    dif = p - q
+    return (dif ** 2) / (p + q + epsilon), np.abs(dif)
+
+def calcular_w_lambdas(p: np.ndarray, q: np.ndarray, lambdas: np.ndarray,
+                       epsilon: float = EPSILON_PADRAO, normalizar: bool = True) -> np.ndarray:
+    """
+    Calcula a curva W(λ) para um vetor de λ em uma única passada.
+
+    Normalização e termo chi são calculados uma só vez; apenas exp(-λ|p - q|)
+    varia com λ. Para `p, q` 1-D retorna `(L,)`; para lotes `(N, K)` retorna `(N, L)`.
+    """
+    p, q = validar_distribuicoes_lote(p, q)
+    termo_chi, dif_abs = _termos_w(p, q, epsilon, normalizar)
+    lambdas = np.asarray(lambdas, dtype=np.float64).ravel()
+    forma = termo_chi.shape
+    termo_chi = termo_chi.reshape(-1, forma[-1])
+    dif_abs = dif_abs.reshape(-1, forma[-1])
+    n, k = termo_chi.shape
+    resultado = np.empty((n, len(lambdas)))
+    bloco_l = max(1, min(len(lambdas), ELEMENTOS_BLOCO_LAMBDAS // k))
+    bloco_n = max(1, ELEMENTOS_BLOCO_LAMBDAS // (bloco_l * k))
+    for i in range(0, n, bloco_n):
+        chi, a = termo_chi[i:i + bloco_n], dif_abs[i:i + bloco_n]
+        for j in range(0, len(lambdas), bloco_l):
+            fator_exp = np.exp(-lambdas[None, j:j + bloco_l, None] * a[:, None, :])
+            resultado[i:i + bloco_n, j:j + bloco_l] = np.matmul(fator_exp, chi[:, :, None])[..., 0]
+    return resultado.reshape(forma[:-1] + (len(lambdas),))
+
+METRICAS_DIVERGENCIA = ('w', 'kl', 'js', 'hellinger')
+
+def _validar_metricas(metricas):
+    if metricas is None:
+        return METRICAS_DIVERGENCIA
+    desconhecidas = set(metricas) - set(METRICAS_DIVERGENCIA)
+    if desconhecidas:
+        raise ValueError(f"Métricas desconhecidas: {sorted(desconhecidas)}. Use {METRICAS_DIVERGENCIA}")
+    return tuple(metricas)
+
+def calcular_divergencias(p: np.ndarray, q: np.ndarray, metricas=None, epsilon: float = EPSILON_PADRAO,
+                          lambda_suavizacao: float = LAMBDA_PADRAO) -> dict:
+    """
+    Calcula várias divergências entre P e Q normalizando uma única vez.
+
+    `metricas` é um subconjunto de ('w', 'kl', 'js', 'hellinger') (padrão: todas).
+    Retorna um dicionário {métrica: valor} com os mesmos valores das funções individuais.
+    """
+    metricas = _validar_metricas(metricas)
+    p, q = validar_distribuicoes(p, q)
+    resultados = obter_backend().divergencias(p.ravel(), q.ravel(), metricas, epsilon, lambda_suavizacao)
+    return {nome: float(resultados[nome]) for nome in metricas}
+
+def calcular_divergencias_lote(p: np.ndarray, q: np.ndarray, metricas=None, epsilon: float = EPSILON_PADRAO,
+                               lambda_suavizacao: float = LAMBDA_PADRAO, axis: int = -1) -> dict:
+    """Versão em lote de `calcular_divergencias`: retorna {métrica: array (N,)}."""
+    metricas = _validar_metricas(metricas)
+    p, q = validar_distribuicoes_lote(p, q, axis)
+    return obter_backend().divergencias(p, q, metricas, epsilon, lambda_suavizacao)
@@ -8,11 +8,13 @@ from scipy.optimize import minimize
 
 def otimizar_parametros_w(p: np.ndarray, q: np.ndarray) -> float:
     """Encontra o lambda que minimiza a diferença entre W e KL (exemplo)."""
-    from .matematica_base import calcular_w, calcular_kl
+    from .matematica_base import calcular_kl, validar_distribuicoes, _termos_w, EPSILON_PADRAO
     kl_alvo = calcular_kl(p, q)
+    # Termos independentes de λ calculados uma única vez
+    termo_chi, dif_abs = _termos_w(*validar_distribuicoes(p, q), EPSILON_PADRAO, True)
     
     def objetivo(lambd):
-        return (calcular_w(p, q, lambda_suavizacao=lambd[0]) - kl_alvo)**2
+        return (np.dot(termo_chi, np.exp(-lambd[0] * dif_abs)) - kl_alvo)**2
     
     res = minimize(objetivo, [0.5], bounds=[(0.01, 10.0)])
     return float(res.x[0])
@@ -13,8 +13,5 @@ def operacoes_tensorais_w(tensor_p: np.ndarray, tensor_q: np.ndarray) -> np.ndar
 
 def broadcast_w(p: np.ndarray, matriz_q: np.ndarray) -> np.ndarray:
     """Calcula W entre um vetor e cada linha de uma matriz."""
-    resultados = []
-    from .matematica_base import calcular_w
-    for q in matriz_q:
-        resultados.append(calcular_w(p, q))
-    return np.array(resultados)
+    from .matematica_base import calcular_w_lote
+    return calcular_w_lote(matriz_q, p)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Divergência W - Kernel Fundido com Área de Trabalho Reutilizável
+Autor: Luiz Tiago Wilcke
+"""
+import numpy as np
+from .matematica_base import EPSILON_PADRAO, LAMBDA_PADRAO
+
+
+class WorkspaceW:
+    """
+    Área de trabalho pré-alocada para calcular W repetidamente com o mesmo K.
+
+    Todas as etapas (normalização, termo chi, fator exponencial e soma) usam
+    ufuncs in-place sobre três buffers fixos, sem alocar novos arrays por chamada.
+    Útil em monitores de streaming que avaliam W milhões de vezes.
+    """
+    def __init__(self, k: int, dtype=np.float64, epsilon: float = EPSILON_PADRAO,
+                 lambda_suavizacao: float = LAMBDA_PADRAO):
+        self.k = k
+        self.dtype = np.dtype(dtype)
+        self.epsilon = epsilon
+        self.lambda_suavizacao = lambda_suavizacao
+        self._p = np.empty(k, dtype=self.dtype)
+        self._q = np.empty(k, dtype=self.dtype)
+        self._aux = np.empty(k, dtype=self.dtype)
+
+    def _carregar(self, x, destino: np.ndarray, normalizar: bool):
+        x = np.asarray(x)
+        if x.shape != destino.shape:
+            raise ValueError(f"Dimensões incompatíveis: {x.shape} vs {destino.shape}")
+        if normalizar:
+            np.maximum(x, self.epsilon, out=destino)
+            np.divide(destino, destino.sum(), out=destino)
+        else:
+            np.copyto(destino, x, casting='same_kind')
+
+    def calcular_w(self, p: np.ndarray, q: np.ndarray, normalizar: bool = True) -> float:
+        """Calcula W(P, Q) reutilizando os buffers pré-alocados."""
+        p_n, q_n, aux = self._p, self._q, self._aux
+        self._carregar(p, p_n, normalizar)
+        self._carregar(q, q_n, normalizar)
+        np.subtract(p_n, q_n, out=aux)           # diferença
+        np.add(p_n, q_n, out=q_n)
+        q_n += self.epsilon                      # denominador
+        np.square(aux, out=p_n)
+        p_n /= q_n                               # termo chi
+        np.abs(aux, out=aux)
+        aux *= -self.lambda_suavizacao
+        np.exp(aux, out=aux)                     # fator de suavização
+        return float(np.dot(p_n, aux))
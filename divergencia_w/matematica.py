@@ -9,6 +9,7 @@ estatística simétrica e robusta, juntamente com a Divergência KL para compara
 
 import numpy as np
 from typing import Union, Tuple
+from .core.backends import obter_backend
 
 # Constantes de Regularização
 EPSILON_PADRAO = 1e-10
@@ -99,18 +100,8 @@ def calcular_kl(p: np.ndarray, q: np.ndarray,
     """
     p, q = validar_distribuicoes(p, q)
     
-    if normalizar:
-        p = normalizar_distribuicao(p, epsilon)
-        q = normalizar_distribuicao(q, epsilon)
-    else:
-        p = np.maximum(p, epsilon)
-        q = np.maximum(q, epsilon)
-    
-    # KL = Σ p(x) * log(p(x) / q(x))
-    razao = p / q
-    kl = np.sum(p * np.log(razao))
-    
-    return float(kl)
+    # KL = Σ p(x) * log(p(x) / q(x)), calculada pelo backend selecionado
+    return float(obter_backend().kl(p, q, epsilon, normalizar))
 
 
 def calcular_w(p: np.ndarray, q: np.ndarray,
@@ -171,28 +162,9 @@ def calcular_w(p: np.ndarray, q: np.ndarray,
     """
     p, q = validar_distribuicoes(p, q)
     
-    if normalizar:
-        p = normalizar_distribuicao(p, epsilon)
-        q = normalizar_distribuicao(q, epsilon)
-    
-    # Diferença entre distribuições
-    diferenca = p - q
-    diferenca_abs = np.abs(diferenca)
-    diferenca_quadrado = diferenca ** 2
-    
-    # Termo do denominador (estabilização)
-    denominador = p + q + epsilon
-    
-    # Termo Chi-quadrado modificado
-    termo_chi = diferenca_quadrado / denominador
-    
-    # Fator de suavização exponencial
-    fator_suavizacao = np.exp(-lambda_suavizacao * diferenca_abs)
-    
-    # Divergência W final
-    w = np.sum(termo_chi * fator_suavizacao)
-    
-    return float(w)
+    # Normalização, termo chi, fator exponencial e soma no backend selecionado
+    # (ver core.backends.definir_backend)
+    return float(obter_backend().w(p, q, epsilon, lambda_suavizacao, normalizar))
 
 
 def calcular_w_continua(p: np.ndarray, q: np.ndarray,
@@ -270,17 +242,7 @@ def calcular_jensen_shannon(p: np.ndarray, q: np.ndarray,
         Valor da divergência JSD (0 <= JSD <= log(2))
     """
     p, q = validar_distribuicoes(p, q)
-    p = normalizar_distribuicao(p, epsilon)
-    q = normalizar_distribuicao(q, epsilon)
-    
-    # Mistura M
-    m = 0.5 * (p + q)
-    
-    # JSD
-    jsd = 0.5 * calcular_kl(p, m, epsilon, normalizar=False) + \
-          0.5 * calcular_kl(q, m, epsilon, normalizar=False)
-    
-    return float(jsd)
+    return float(obter_backend().jensen_shannon(p, q, epsilon))
 
 
 def calcular_hellinger(p: np.ndarray, q: np.ndarray,
@@ -303,15 +265,7 @@ def calcular_hellinger(p: np.ndarray, q: np.ndarray,
         Distância de Hellinger (0 <= H <= 1)
     """
     p, q = validar_distribuicoes(p, q)
-    p = normalizar_distribuicao(p, epsilon)
-    q = normalizar_distribuicao(q, epsilon)
-    
-    raiz_p = np.sqrt(p)
-    raiz_q = np.sqrt(q)
-    
-    hellinger = np.sqrt(0.5 * np.sum((raiz_p - raiz_q) ** 2))
-    
-    return float(hellinger)
+    return float(obter_backend().hellinger(p, q, epsilon))
 
 
 def decomposicao_w(p: np.ndarray, q: np.ndarray,
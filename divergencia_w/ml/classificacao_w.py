@@ -4,7 +4,7 @@ Divergência W - Classificação (KNN)
 Autor: Luiz Tiago Wilcke
 """
 import numpy as np
-from ..core.matematica_base import calcular_w
+from ..core.distancias_w import cdist_w
 
 class KNN_W:
     """K-Nearest Neighbors usando Divergência W."""
@@ -16,10 +16,7 @@ class KNN_W:
         self.y_train = y
         
     def predict(self, X):
-        preds = []
-        for x in X:
-            distancias = [calcular_w(x, xt) for xt in self.X_train]
-            vizinhos = np.argsort(distancias)[:self.k]
-            rotulos = self.y_train[vizinhos]
-            preds.append(np.bincount(rotulos).argmax())
-        return np.array(preds)
+        distancias = cdist_w(X, self.X_train)
+        vizinhos = np.argsort(distancias, axis=1)[:, :self.k]
+        rotulos = self.y_train[vizinhos]
+        return np.array([np.bincount(r).argmax() for r in rotulos])
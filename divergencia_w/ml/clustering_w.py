@@ -4,7 +4,7 @@ Divergência W - Agrupamento (Clustering)
 Autor: Luiz Tiago Wilcke
 """
 import numpy as np
-from ..core.matematica_base import calcular_w
+from ..core.distancias_w import cdist_w
 
 class KMeansW:
     """Algoritmo K-Means usando Divergência W como métrica de distância."""
@@ -24,8 +24,4 @@ class KMeansW:
                 self.centroides[i] = np.mean(X[rotulos == i], axis=0)
                 
     def _proximo_centroide(self, X):
-        rotulos = []
-        for x in X:
-            distancias = [calcular_w(x, c) for c in self.centroides]
-            rotulos.append(np.argmin(distancias))
-        return np.array(rotulos)
+        return np.argmin(cdist_w(X, self.centroides), axis=1)
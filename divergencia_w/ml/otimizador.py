@@ -11,6 +11,9 @@ class OtimizadorW:
         self.lr = lr
         
     def step(self, params, grads):
+        if isinstance(params, np.ndarray):
+            params -= self.lr * np.asarray(grads)
+            return params
         for i in range(len(params)):
             params[i] -= self.lr * grads[i]
         return params
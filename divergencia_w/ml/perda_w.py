@@ -5,6 +5,7 @@ Autor: Luiz Tiago Wilcke
 """
 import numpy as np
 from ..core.matematica_base import calcular_w
+from ..core.derivadas import gradiente_w_lote
 
 class PerdaW:
     """Implementa Divergência W como função de perda para treinamento."""
@@ -14,3 +15,8 @@ class PerdaW:
     def __call__(self, y_true, y_pred):
         # Assume que y_true e y_pred são distribuições (softmax output)
         return calcular_w(y_true, y_pred, lambda_suavizacao=self.lambda_suavizacao)
+
+    def gradiente(self, y_true, y_pred):
+        """Gradiente analítico da perda em relação a y_pred (aceita lotes (N, K))."""
+        # W é simétrica, então ∂W(y_true, y_pred)/∂y_pred = ∂W(y_pred, y_true)/∂y_pred
+        return gradiente_w_lote(y_pred, y_true, lambda_suavizacao=self.lambda_suavizacao)
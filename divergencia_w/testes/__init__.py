@@ -4,6 +4,7 @@ from .homogeneidade import teste_homogeneidade_w
 from .independencia import teste_independencia_w
 from .simetria_teste import verificar_simetria_global
 from .robustez_teste import verificar_robustez_zeros
+from .backends_teste import verificar_equivalencia_backend
 from .sensibilidade import analise_sensibilidade_lambda
 from .p_valor_w import calcular_p_valor_w
 from .bootstrap_w import bootstrap_divergencia_w
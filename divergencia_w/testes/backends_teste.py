@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Divergência W - Equivalência entre Backends
+Autor: Luiz Tiago Wilcke
+"""
+import numpy as np
+from ..core.backends import definir_backend, obter_backend
+from ..core.matematica_base import calcular_w_lote
+from ..core.distancias_w import cdist_w, pdist_w
+
+def verificar_equivalencia_backend(nome: str = 'numba', n: int = 40, dim: int = 16,
+                                   tolerancia: float = 1e-12, seed: int = 0) -> bool:
+    """
+    Compara um backend com a referência `numpy` em lotes com broadcasting
+    (`(N, 1, K)` contra `(1, M, K)`), em `cdist_w` com blocos quadrados e em
+    `pdist_w`. O backend ativo é restaurado ao final.
+    """
+    rng = np.random.default_rng(seed)
+    A = rng.random((n, dim))
+    B = rng.random((n, dim))
+    casos = [
+        lambda: calcular_w_lote(A[:, None], B[None, :]),
+        lambda: calcular_w_lote(A[:4, None], A[None, :4]),
+        lambda: calcular_w_lote(A, B[0]),
+        lambda: cdist_w(A, B),
+        lambda: cdist_w(A, B, memoria_max_bytes=2**12),
+        lambda: pdist_w(A[:10]),
+        lambda: pdist_w(A, memoria_max_bytes=2**12),
+    ]
+    anterior = obter_backend().nome
+    try:
+        definir_backend('numpy')
+        referencias = [caso() for caso in casos]
+        definir_backend(nome)
+        resultados = [caso() for caso in casos]
+    finally:
+        definir_backend(anterior)
+    return all(r.shape == ref.shape and np.allclose(r, ref, rtol=tolerancia, atol=tolerancia)
+               for r, ref in zip(resultados, referencias))